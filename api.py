@@ -4,6 +4,10 @@ FastAPI 后端服务
 """
 import sys
 import os
+import time
+
+# 启动计时起点（用于冷启动耗时报告）
+_STARTUP_BEGIN = time.perf_counter()
 
 # 添加backend路径到Python路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
@@ -20,6 +24,8 @@ import asyncio
 from backend.database import db
 from backend.utils import logger
 
+_IMPORT_ELAPSED = time.perf_counter() - _STARTUP_BEGIN
+
 app = FastAPI(title="抖音视频爬虫 API", version="1.0.0")
 
 # CORS配置
@@ -42,6 +48,9 @@ crawler_status = {
     "total": 0
 }
 
+# 当前运行的爬虫实例（用于读取运行指标）
+current_crawler = None
+
 
 # ==================== 数据模型 ====================
 class CrawlerConfig(BaseModel):
@@ -51,6 +60,7 @@ class CrawlerConfig(BaseModel):
     creator_urls: Optional[List[str]] = None
     max_count: int = 15
     enable_media: bool = False
+    resume: bool = False  # 从上次中断的断点继续
 
 
 class VideoResponse(BaseModel):
@@ -72,6 +82,15 @@ class CreatorResponse(BaseModel):
     aweme_count: int
 
 
+# ==================== 启动事件 ====================
+
+@app.on_event("startup")
+async def report_startup_time():
+    """报告冷启动耗时（签名JS在首次爬取时才编译，不计入此处）"""
+    total = time.perf_counter() - _STARTUP_BEGIN
+    logger.info(f"[API] 启动完成: 模块导入 {_IMPORT_ELAPSED * 1000:.0f} ms, 总耗时 {total * 1000:.0f} ms")
+
+
 # ==================== API 路由 ====================
 
 @app.get("/")
@@ -83,7 +102,8 @@ async def read_root():
 @app.get("/api/status")
 async def get_status():
     """获取爬虫状态"""
-    return crawler_status
+    metrics = current_crawler.get_metrics() if current_crawler else {}
+    return {**crawler_status, "metrics": metrics}
 
 
 @app.post("/api/start")
@@ -121,7 +141,10 @@ async def start_crawler(config_data: CrawlerConfig, background_tasks: Background
         config.ENABLE_GET_MEDIA = config_data.enable_media
         config.settings.ENABLE_GET_MEDIA = config_data.enable_media
         
-        logger.info(f"[API] 配置已更新: type={config.CRAWLER_TYPE}, keywords={config.KEYWORDS}, videos={config.DY_SPECIFIED_ID_LIST}")
+        config.RESUME_CRAWL = config_data.resume
+        config.settings.RESUME_CRAWL = config_data.resume
+        
+        logger.info(f"[API] 配置已更新: type={config.CRAWLER_TYPE}, keywords={config.KEYWORDS}, videos={config.DY_SPECIFIED_ID_LIST}, resume={config.RESUME_CRAWL}")
         
     except Exception as e:
         logger.error(f"更新配置失败: {e}")
@@ -219,6 +242,8 @@ async def clear_videos():
 
 async def run_crawler():
     """后台运行爬虫"""
+    global current_crawler
+    crawler = None
     try:
         logger.info("[API] 开始执行爬虫任务...")
         
@@ -226,13 +251,17 @@ async def run_crawler():
         from backend.crawler.core import DouYinCrawler
         
         crawler = DouYinCrawler()
+        current_crawler = crawler
         await crawler.start()
-        # await crawler.close()  # start方法中使用上下文管理器自动关闭，无需手动调用
         
         logger.info("[API] 爬虫任务完成")
     except Exception as e:
         logger.error(f"[API] 爬虫任务失败: {e}")
     finally:
+        # 浏览器由 start() 中的上下文管理器关闭，这里主要释放HTTP连接池
+        if crawler:
+            await crawler.close()
+        current_crawler = None
         crawler_status["running"] = False
         crawler_status["current_task"] = None
 
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP 客户端基准测试：每次请求新建 AsyncClient vs 共享连接池
+
+用法（在项目根目录执行）:
+    python backend/benchmarks/bench_http_client.py --requests 2000 --concurrency 10
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# 添加backend路径到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from crawler.client import DouYinClient
+
+_BODY = b'{"status_code": 0, "aweme_detail": {}}'
+_RESPONSE = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Content-Type: application/json\r\n"
+    b"Content-Length: " + str(len(_BODY)).encode() + b"\r\n"
+    b"Connection: keep-alive\r\n"
+    b"\r\n" + _BODY
+)
+
+
+async def _handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """桩服务器：对每个请求返回固定JSON，支持keep-alive"""
+    try:
+        while True:
+            header = await reader.readuntil(b"\r\n\r\n")
+            if not header:
+                break
+            writer.write(_RESPONSE)
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionResetError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _run(total: int, concurrency: int, fetch) -> float:
+    """并发执行 total 次请求，返回每秒请求数"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await fetch()
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(total)])
+    return total / (time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="HTTP 客户端连接池基准测试")
+    parser.add_argument("--requests", type=int, default=2000, help="每轮请求数")
+    parser.add_argument("--concurrency", type=int, default=10, help="并发数")
+    args = parser.parse_args()
+
+    server = await asyncio.start_server(_handle_connection, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    url = f"http://127.0.0.1:{port}/aweme/v1/web/aweme/detail/"
+
+    async def fetch_per_request_client():
+        # 旧实现：每次请求新建 AsyncClient
+        async with httpx.AsyncClient() as client:
+            response = await client.request("GET", url, timeout=60)
+        return response.json()
+
+    dy_client = DouYinClient(timeout=60)
+
+    async def fetch_pooled():
+        return await dy_client.request("GET", url)
+
+    async with server:
+        before = await _run(args.requests, args.concurrency, fetch_per_request_client)
+        after = await _run(args.requests, args.concurrency, fetch_pooled)
+        await dy_client.close()
+
+    print(f"每次新建客户端: {before:8.1f} req/s")
+    print(f"共享连接池:     {after:8.1f} req/s")
+    print(f"提升:           {after / before:8.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -10,9 +10,26 @@ __all__ = [
     'HEADLESS', 'SAVE_LOGIN_STATE', 'USER_DATA_DIR',
     'ENABLE_CDP_MODE', 'CDP_DEBUG_PORT', 'CUSTOM_BROWSER_PATH',
     'CDP_HEADLESS', 'BROWSER_LAUNCH_TIMEOUT', 'AUTO_CLOSE_BROWSER',
-    'START_PAGE', 'CRAWLER_MAX_NOTES_COUNT', 'MAX_CONCURRENCY_NUM',
-    'CRAWLER_MAX_SLEEP_SEC', 'ENABLE_GET_MEDIA', 'ENABLE_IP_PROXY',
+    'START_PAGE', 'CRAWLER_MAX_NOTES_COUNT', 'SEARCH_PREFETCH_PAGES', 'KEYWORD_WORKER_NUM', 'CREATOR_WORKER_NUM',
+    'RESUME_CRAWL', 'CHECKPOINT_DETAIL_INTERVAL', 'DEDUP_POLICY', 'DEDUP_REFRESH_AGE_SEC',
+    'SHORT_URL_RESOLVE_CONCURRENCY', 'DETAIL_WORKER_NUM', 'DETAIL_QUEUE_SIZE',
+    'ENABLE_INCREMENTAL_CREATOR', 'ENABLE_CREATOR_LIST_PAYLOAD', 'CREATOR_DETAIL_REQUIRED_FIELDS',
+    'MAX_CONCURRENCY_NUM',
+    'SIGN_WORKER_NUM', 'SIGN_QUEUE_SIZE',
+    'CRAWLER_MAX_SLEEP_SEC', 'DETAIL_RATE_PER_SEC', 'RATE_LIMITS',
+    'RETRY_POLICIES', 'RETRY_BACKOFF_BASE_SEC', 'RETRY_BACKOFF_MAX_SEC',
+    'RETRY_ON_STATUS', 'RETRY_BUDGET',
+    'ENABLE_ADAPTIVE_CONCURRENCY', 'ADAPTIVE_MIN_CONCURRENCY', 'ADAPTIVE_MAX_CONCURRENCY',
+    'ADAPTIVE_MIN_RATE_SCALE', 'ADAPTIVE_MAX_RATE_SCALE', 'ADAPTIVE_RATE_STEP',
+    'ADAPTIVE_DECREASE_FACTOR', 'ADAPTIVE_ERROR_BURST', 'ADAPTIVE_ERROR_WINDOW_SEC',
+    'ADAPTIVE_COOLDOWN_SEC',
+    'HTTP_MAX_CONNECTIONS', 'HTTP_MAX_KEEPALIVE_CONNECTIONS',
+    'HTTP_KEEPALIVE_EXPIRY', 'ENABLE_HTTP2', 'LOCAL_STORAGE_CACHE_TTL',
+    'ENABLE_GET_MEDIA', 'ENABLE_IP_PROXY',
     'IP_PROXY_POOL_COUNT', 'IP_PROXY_PROVIDER_NAME',
-    'DATABASE_PATH', 'VIDEO_SAVE_DIR', 'IMAGE_SAVE_DIR',
+    'DATABASE_PATH', 'DB_BATCH_SIZE', 'DB_FLUSH_INTERVAL_SEC', 'DB_WRITER_QUEUE_SIZE', 'SQLITE_PRAGMAS',
+    'VIDEO_SAVE_DIR', 'IMAGE_SAVE_DIR', 'MEDIA_CHUNK_SIZE',
+    'MEDIA_DOWNLOAD_WORKERS', 'MEDIA_QUEUE_SIZE', 'MEDIA_PER_HOST_CONCURRENCY',
+    'MEDIA_MAX_CONCURRENT_DOWNLOADS', 'MEDIA_IMAGE_CONCURRENCY_PER_POST',
     'KEYWORDS', 'PUBLISH_TIME_TYPE', 'DY_SPECIFIED_ID_LIST', 'DY_CREATOR_ID_LIST'
 ]
@@ -44,15 +44,145 @@ AUTO_CLOSE_BROWSER = True
 # 开始页数
 START_PAGE = 1
 
+# 是否从上次中断的断点继续爬取（关键词页码、创作者翻页游标、未完成的视频ID）
+RESUME_CRAWL = False
+
+# 指定视频模式每完成多少个视频保存一次断点（并输出进度）
+CHECKPOINT_DETAIL_INTERVAL = 100
+
+# 已保存作品的处理策略（启动时从数据库加载已保存的作品ID）
+# none: 不去重，每次完整保存 | skip: 跳过 | refresh_stats: 只用返回数据刷新互动数，不请求详情
+# refresh_after_age: 距上次爬取超过 DEDUP_REFRESH_AGE_SEC 才重新完整爬取，否则跳过
+# 跳过和刷新互动数时不会更新描述、关键词等字段；开启 ENABLE_GET_MEDIA 时仍会补下载尚未下载的媒体
+DEDUP_POLICY = "none"
+
+# refresh_after_age 策略的重新爬取间隔（秒）
+DEDUP_REFRESH_AGE_SEC = 7 * 24 * 3600
+
 # 最大爬取视频数量
 CRAWLER_MAX_NOTES_COUNT = 15
 
+# 关键词搜索时最多预取的页数（翻页与结果处理并行）
+SEARCH_PREFETCH_PAGES = 2
+
+# 同时搜索的关键词数量
+KEYWORD_WORKER_NUM = 3
+
+# 同时翻页的创作者数量（创作者轮流翻页，每轮每个创作者只翻一页）
+CREATOR_WORKER_NUM = 3
+
+# 创作者增量爬取：记录每个创作者已爬取的最新作品时间，下次翻到该位置即停止
+ENABLE_INCREMENTAL_CREATOR = True
+
+# 创作者模式直接使用作品列表接口返回的数据保存，缺少必需字段时才请求视频详情接口
+ENABLE_CREATOR_LIST_PAYLOAD = True
+
+# 作品列表数据必须包含的字段（点号表示嵌套，| 表示任一字段存在即可）
+CREATOR_DETAIL_REQUIRED_FIELDS = [
+    "aweme_id",
+    "desc",
+    "create_time",
+    "author.sec_uid",
+    "statistics.digg_count",
+    "video.play_addr.url_list|images",
+]
+
 # 最大并发数
 MAX_CONCURRENCY_NUM = 1
 
-# 爬取间隔时间（秒）
+# 视频详情协程数和任务队列上限（流式处理，处理中的任务数有上限，请求并发仍受上面的并发上限约束）
+DETAIL_WORKER_NUM = 8
+DETAIL_QUEUE_SIZE = 100
+
+# a_bogus 签名工作线程数（每个线程一个预编译的 douyin.js 上下文）
+SIGN_WORKER_NUM = 4
+
+# 签名任务排队上限，超过后请求方等待
+SIGN_QUEUE_SIZE = 32
+
+# 爬取间隔时间（秒），作为搜索和作品列表翻页的默认限速
 CRAWLER_MAX_SLEEP_SEC = 2
 
+# 视频详情请求速率（每秒请求数），None 表示与翻页相同（每 CRAWLER_MAX_SLEEP_SEC 秒 1 次）
+# 调高可加快指定视频/创作者模式，但更容易触发风控，需要时再显式开启
+DETAIL_RATE_PER_SEC = None
+
+# 限速配置（令牌桶）：rate 为每秒请求数，burst 为允许的突发请求数
+# 所有并发任务共享同一个限速器，按接口类别分别限速
+RATE_LIMITS = {
+    "search": {"rate": 1 / CRAWLER_MAX_SLEEP_SEC, "burst": 1},  # 关键词搜索翻页
+    "detail": {"rate": DETAIL_RATE_PER_SEC or 1 / CRAWLER_MAX_SLEEP_SEC, "burst": 1},  # 视频详情
+    "post_list": {"rate": 1 / CRAWLER_MAX_SLEEP_SEC, "burst": 1},  # 创作者作品列表翻页
+    "user": {"rate": 1, "burst": 1},  # 创作者信息
+    "media": {"rate": 5, "burst": 10},  # 视频/图片下载
+    "short_url": {"rate": 5, "burst": 5},  # 短链接解析
+}
+
+# 同时解析的短链接数量（解析结果缓存在数据库 short_urls 表中）
+SHORT_URL_RESOLVE_CONCURRENCY = 8
+
+# ==================== 请求重试 ====================
+# 各接口类别的最大尝试次数（含首次请求），"default" 用于未配置的类别
+RETRY_POLICIES = {
+    "default": {"max_attempts": 3},
+    "search": {"max_attempts": 4},
+    "detail": {"max_attempts": 3},
+    "post_list": {"max_attempts": 4},
+    "media": {"max_attempts": 3},
+}
+
+# 指数退避：第 n 次失败后等待 0 ~ min(MAX, BASE * 2^(n-1)) 秒的随机时间
+RETRY_BACKOFF_BASE_SEC = 1
+RETRY_BACKOFF_MAX_SEC = 30
+
+# 需要重试的 HTTP 状态码（超时和网络错误总是重试）
+RETRY_ON_STATUS = [429, 500, 502, 503, 504]
+
+# 单次运行允许的重试总次数，耗尽后失败直接返回
+RETRY_BUDGET = 200
+
+# ==================== 自适应并发 ====================
+# 是否根据风控/错误信号自动调整并发上限和请求速率（AIMD）
+# 启用后 MAX_CONCURRENCY_NUM 作为初始并发上限；默认只在出错时降速，恢复正常后逐步回到配置值，
+# 不会超过 MAX_CONCURRENCY_NUM 和 RATE_LIMITS
+ENABLE_ADAPTIVE_CONCURRENCY = True
+
+# 并发上限的调整范围（上限默认等于 MAX_CONCURRENCY_NUM，调高后正常时会逐步超过配置的并发数）
+ADAPTIVE_MIN_CONCURRENCY = 1
+ADAPTIVE_MAX_CONCURRENCY = MAX_CONCURRENCY_NUM
+
+# 速率倍率（相对 RATE_LIMITS）的调整范围和每次增加的步长
+# 最大倍率默认 1.0，即 RATE_LIMITS 为速率上限；大于 1 时正常响应会把速率提高到配置值以上
+ADAPTIVE_MIN_RATE_SCALE = 0.1
+ADAPTIVE_MAX_RATE_SCALE = 1.0
+ADAPTIVE_RATE_STEP = 0.1
+
+# 遇到风控时并发上限和速率倍率的乘性衰减系数
+ADAPTIVE_DECREASE_FACTOR = 0.5
+
+# 普通请求错误：窗口时间（秒）内出现该数量才视为突发并降速
+ADAPTIVE_ERROR_BURST = 3
+ADAPTIVE_ERROR_WINDOW_SEC = 30
+
+# 两次降速之间的最小间隔（秒）
+ADAPTIVE_COOLDOWN_SEC = 10
+
+# ==================== 网络配置 ====================
+# 连接池最大连接数（对所有主机合计生效；API 与媒体下载各自使用独立的连接池）
+HTTP_MAX_CONNECTIONS = 10
+
+# 连接池保持的最大空闲连接数
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 10
+
+# 空闲连接保持时间（秒）
+HTTP_KEEPALIVE_EXPIRY = 30
+
+# 是否启用 HTTP/2（需要安装 h2: pip install httpx[http2]）
+ENABLE_HTTP2 = False
+
+# localStorage（msToken）缓存时间（秒），过期后才重新从浏览器读取
+LOCAL_STORAGE_CACHE_TTL = 300
+
 # ==================== 功能开关 ====================
 # 是否下载媒体文件（视频/图片）
 ENABLE_GET_MEDIA = False
@@ -71,8 +201,45 @@ IP_PROXY_PROVIDER_NAME = "kuaidaili"
 # 数据库文件路径
 DATABASE_PATH = "data/douyin.db"
 
-# 视频保存目录
+# 视频数据批量写入：缓冲条数达到该值时提交
+DB_BATCH_SIZE = 50
+
+# 视频数据批量写入：缓冲数据最长等待时间（秒）
+DB_FLUSH_INTERVAL_SEC = 2
+
+# 数据库写入线程排队上限，超过后爬取协程等待写入完成
+DB_WRITER_QUEUE_SIZE = 100
+
+# SQLite 调优参数，每个连接建立时执行 PRAGMA
+# WAL 模式下 API 读取与爬虫写入互不阻塞
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",  # WAL 模式下 NORMAL 即可保证数据库不损坏
+    "cache_size": -65536,  # 负数单位为 KiB，即 64MB 页缓存
+    "mmap_size": 268435456,  # 256MB 内存映射
+    "busy_timeout": 5000,  # 锁等待超时（毫秒）
+}
+
+# 视频保存目录（按内容 sha256 命名: 目录/哈希前两位/哈希.mp4）
 VIDEO_SAVE_DIR = "data/videos"
 
-# 图片保存目录
+# 图片保存目录（同上，扩展名 .jpg）
 IMAGE_SAVE_DIR = "data/images"
+
+# 媒体流式下载分块大小（字节），决定单个下载占用的内存上限
+MEDIA_CHUNK_SIZE = 1024 * 1024
+
+# 媒体下载协程数（与元数据爬取并行）
+MEDIA_DOWNLOAD_WORKERS = 4
+
+# 媒体下载队列上限，队列满时爬取流程等待
+MEDIA_QUEUE_SIZE = 100
+
+# 单个 CDN 主机的最大并发下载数
+MEDIA_PER_HOST_CONCURRENCY = 2
+
+# 全局最大并发下载数（所有主机合计）
+MEDIA_MAX_CONCURRENT_DOWNLOADS = 8
+
+# 单个图文作品内的最大并发图片下载数
+MEDIA_IMAGE_CONCURRENCY_PER_POST = 4
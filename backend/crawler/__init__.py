@@ -6,11 +6,14 @@ from .client import DouYinClient
 from .field import SearchChannelType, SearchSortType, PublishTimeType, VideoUrlInfo, CreatorUrlInfo
 from .exception import DataFetchError, IPBlockError
 from .login import DouYinLogin
+from .worker_pool import WorkerPool
+from .downloader import MediaDownloader
+from .detail_pool import DetailWorkerPool
 
 __all__ = [
     'DouYinClient',
     'SearchChannelType', 'SearchSortType', 'PublishTimeType',
     'VideoUrlInfo', 'CreatorUrlInfo',
     'DataFetchError', 'IPBlockError',
-    'DouYinLogin'
+    'DouYinLogin', 'WorkerPool', 'MediaDownloader', 'DetailWorkerPool'
 ]
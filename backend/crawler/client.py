@@ -5,8 +5,11 @@
 import asyncio
 import copy
 import json
+import os
+import re
+import time
 import urllib.parse
-from typing import Any, Callable, Dict, Optional, Union
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 import httpx
 from playwright.async_api import BrowserContext, Page
@@ -15,11 +18,17 @@ import config
 from utils import logger, get_web_id, get_a_bogus, convert_cookies
 from crawler.exception import DataFetchError
 from crawler.field import SearchChannelType, SearchSortType, PublishTimeType
+from crawler.rate_limiter import RateLimiter
+from crawler.concurrency import AdaptiveConcurrencyController
+from crawler.retry import Retrier
 
 
 class DouYinClient:
     """抖音API客户端类"""
     
+    # 风控拦截常见的 4xx 状态码，按 "blocked" 信号反馈给自适应并发控制器
+    BLOCKED_STATUSES = (401, 403, 412, 444)
+    
     def __init__(
         self,
         timeout: int = 60,
@@ -34,6 +43,88 @@ class DouYinClient:
         self._host = "https://www.douyin.com"
         self.playwright_page = playwright_page
         self.cookie_dict = cookie_dict or {}
+        # 长连接池：API 请求与媒体下载分开，避免大文件下载占满 API 连接
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._media_client: Optional[httpx.AsyncClient] = None
+        # localStorage 缓存（msToken 等），避免每次签名都经过浏览器 IPC
+        self._local_storage: Dict = {}
+        self._local_storage_expire_at: float = 0
+        self._local_storage_lock = asyncio.Lock()
+        # 全局限速器，按接口类别限制请求速率
+        self.rate_limiter = RateLimiter()
+        # 自适应并发控制，根据响应状态调整并发上限和限速倍率
+        self.concurrency = AdaptiveConcurrencyController(self.rate_limiter)
+        # 重试策略，按接口类别配置，单次运行共享重试预算
+        self.retrier = Retrier()
+    
+    def _build_http_client(self) -> httpx.AsyncClient:
+        """创建带连接池的 httpx 客户端"""
+        limits = httpx.Limits(
+            max_connections=config.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY,
+        )
+        http2 = config.ENABLE_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("未安装 h2，HTTP/2 已禁用（pip install httpx[http2]）")
+                http2 = False
+        return httpx.AsyncClient(proxy=self.proxy, limits=limits, http2=http2, timeout=self.timeout)
+    
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """API 请求使用的共享客户端"""
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = self._build_http_client()
+        return self._http_client
+    
+    @property
+    def media_client(self) -> httpx.AsyncClient:
+        """媒体下载使用的共享客户端"""
+        if self._media_client is None or self._media_client.is_closed:
+            self._media_client = self._build_http_client()
+        return self._media_client
+    
+    async def close(self):
+        """关闭连接池"""
+        for client in (self._http_client, self._media_client):
+            if client is not None and not client.is_closed:
+                await client.aclose()
+        self._http_client = None
+        self._media_client = None
+    
+    async def get_local_storage(self, force_refresh: bool = False) -> Dict:
+        """获取localStorage，在缓存有效期内直接返回缓存"""
+        if not force_refresh and time.monotonic() < self._local_storage_expire_at:
+            return self._local_storage
+        
+        async with self._local_storage_lock:
+            # 等锁期间可能已被其他请求刷新
+            if not force_refresh and time.monotonic() < self._local_storage_expire_at:
+                return self._local_storage
+            
+            # 获取localStorage，添加重试机制
+            max_retries = 3
+            for attempt in range(max_retries):
+                try:
+                    local_storage = await self.playwright_page.evaluate("() => window.localStorage")
+                    self._local_storage = local_storage or {}
+                    self._local_storage_expire_at = time.monotonic() + config.LOCAL_STORAGE_CACHE_TTL
+                    return self._local_storage
+                except Exception as e:
+                    if attempt < max_retries - 1:
+                        logger.warning(f"获取localStorage失败，重试 {attempt + 1}/{max_retries}: {e}")
+                        await asyncio.sleep(1)
+                    else:
+                        # 失败时不写入缓存，下次请求重新读取
+                        logger.error(f"获取localStorage失败，使用空值: {e}")
+            return {}
+    
+    def invalidate_local_storage(self):
+        """使localStorage缓存失效，下次签名时重新读取"""
+        self._local_storage_expire_at = 0
     
     async def _process_request_params(
         self,
@@ -47,21 +138,10 @@ class DouYinClient:
             return
         
         headers = headers or self.headers
+        # 重试时参数会再次签名，去掉上一次的签名
+        params.pop("a_bogus", None)
         
-        # 获取localStorage，添加重试机制
-        local_storage = {}
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                local_storage = await self.playwright_page.evaluate("() => window.localStorage")
-                break
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    logger.warning(f"获取localStorage失败，重试 {attempt + 1}/{max_retries}: {e}")
-                    await asyncio.sleep(1)
-                else:
-                    logger.error(f"获取localStorage失败，使用空值: {e}")
-                    local_storage = {}
+        local_storage = await self.get_local_storage()
         
         # 通用参数
         common_params = {
@@ -93,29 +173,63 @@ class DouYinClient:
                 logger.warning(f"生成a_bogus失败，跳过签名: {e}")
     
     async def request(self, method: str, url: str, **kwargs):
-        """发送HTTP请求"""
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            response = await client.request(method, url, timeout=self.timeout, **kwargs)
+        """发送HTTP请求，并把响应状态反馈给自适应并发控制器（每个响应只反馈一次）"""
+        try:
+            response = await self.http_client.request(method, url, timeout=self.timeout, **kwargs)
+        except httpx.HTTPError:
+            self.concurrency.record_failure("fetch_error")
+            raise
+        
+        status_code = response.status_code
+        if status_code == 429 or status_code >= 500:
+            self.concurrency.record_failure("http_429" if status_code == 429 else "http_5xx")
+            raise DataFetchError(f"HTTP {status_code}", status_code=status_code)
+        
+        if status_code in self.BLOCKED_STATUSES or response.text == "" or response.text == "blocked":
+            logger.error(f"请求被封禁，状态码: {status_code}，响应: {response.text[:200]}")
+            self.concurrency.record_failure("blocked")
+            # msToken 可能已失效，下次请求重新读取
+            self.invalidate_local_storage()
+            raise DataFetchError(f"账号被封禁, HTTP {status_code}, {response.text[:200]}", status_code=status_code)
         
         try:
-            if response.text == "" or response.text == "blocked":
-                logger.error(f"请求被封禁，响应: {response.text}")
-                raise Exception("账号被封禁")
-            return response.json()
-        except Exception as e:
-            raise DataFetchError(f"{e}, {response.text}")
+            data = response.json()
+        except ValueError as e:
+            if status_code < 400:
+                self.concurrency.record_failure("fetch_error")
+            raise DataFetchError(f"{e}, {response.text}", status_code=status_code)
+        
+        self.concurrency.record_success()
+        return data
     
-    async def get(self, uri: str, params: Optional[Dict] = None, headers: Optional[Dict] = None):
-        """GET请求"""
-        await self._process_request_params(uri, params, headers)
-        headers = headers or self.headers
-        return await self.request(method="GET", url=f"{self._host}{uri}", params=params, headers=headers)
+    async def _send(self, method: str, uri: str, params: Optional[Dict], headers: Optional[Dict], endpoint: str):
+        """单次请求：限速、占用并发名额、签名后发送"""
+        # 先在并发名额之外等待令牌，等待限速的请求不占用名额，其他类别的请求可以继续发送
+        await self.rate_limiter.acquire(endpoint)
+        async with self.concurrency.slot():
+            await self._process_request_params(uri, params, headers, request_method=method)
+            headers = headers or self.headers
+            if method == "POST":
+                return await self.request(method="POST", url=f"{self._host}{uri}", data=params, headers=headers)
+            return await self.request(method="GET", url=f"{self._host}{uri}", params=params, headers=headers)
     
-    async def post(self, uri: str, data: dict, headers: Optional[Dict] = None):
-        """POST请求"""
-        await self. _process_request_params(uri, data, headers, request_method="POST")
-        headers = headers or self.headers
-        return await self.request(method="POST", url=f"{self._host}{uri}", data=data, headers=headers)
+    async def _send_with_retry(self, method: str, uri: str, params: Optional[Dict], headers: Optional[Dict], endpoint: str):
+        """按接口类别的重试策略发送请求，最终失败统一抛出 DataFetchError"""
+        try:
+            # 退避等待在并发名额之外进行，不占用并发
+            return await self.retrier.call(endpoint, lambda: self._send(method, uri, params, headers, endpoint))
+        except DataFetchError:
+            raise
+        except httpx.HTTPError as e:
+            raise DataFetchError(f"{type(e).__name__}: {e}") from e
+    
+    async def get(self, uri: str, params: Optional[Dict] = None, headers: Optional[Dict] = None, endpoint: str = ""):
+        """GET请求，endpoint 为限速和重试类别"""
+        return await self._send_with_retry("GET", uri, params, headers, endpoint)
+    
+    async def post(self, uri: str, data: dict, headers: Optional[Dict] = None, endpoint: str = ""):
+        """POST请求，endpoint 为限速和重试类别"""
+        return await self._send_with_retry("POST", uri, data, headers, endpoint)
     
     async def pong(self, browser_context: BrowserContext) -> bool:
         """检查登录状态"""
@@ -138,6 +252,7 @@ class DouYinClient:
         cookie_str, cookie_dict = convert_cookies(await browser_context.cookies())
         self.headers["Cookie"] = cookie_str
         self.cookie_dict = cookie_dict
+        self.invalidate_local_storage()
     
     async def search_info_by_keyword(
         self,
@@ -172,7 +287,7 @@ class DouYinClient:
         headers = copy.copy(self.headers)
         headers["Referer"] = urllib.parse.quote(referer_url, safe=':/')
         
-        return await self.get("/aweme/v1/web/general/search/single/", query_params, headers=headers)
+        return await self.get("/aweme/v1/web/general/search/single/", query_params, headers=headers, endpoint="search")
     
     async def get_video_by_id(self, aweme_id: str) -> Any:
         """获取视频详情"""
@@ -180,7 +295,7 @@ class DouYinClient:
         headers = copy.copy(self.headers)
         if "Origin" in headers:
             del headers["Origin"]
-        res = await self.get("/aweme/v1/web/aweme/detail/", params, headers)
+        res = await self.get("/aweme/v1/web/aweme/detail/", params, headers, endpoint="detail")
         return res.get("aweme_detail", {})
     
     async def get_user_info(self, sec_user_id: str):
@@ -191,7 +306,7 @@ class DouYinClient:
             "publish_video_strategy_type": 2,
             "personal_center_strategy": 1,
         }
-        return await self.get(uri, params)
+        return await self.get(uri, params, endpoint="user")
     
     async def get_user_aweme_posts(self, sec_user_id: str, max_cursor: str = "") -> Dict:
         """获取用户作品列表"""
@@ -203,17 +318,26 @@ class DouYinClient:
             "locate_query": "false",
             "publish_video_strategy_type": 2,
         }
-        return await self.get(uri, params)
+        return await self.get(uri, params, endpoint="post_list")
     
-    async def get_all_user_aweme_posts(
+    async def iter_user_aweme_posts(
         self,
         sec_user_id: str,
-        callback: Optional[Callable] = None
-    ):
-        """获取用户所有作品"""
+        since_create_time: int = 0,
+        max_cursor: str = ""
+    ) -> AsyncIterator[Tuple[List[Dict], str, bool]]:
+        """
+        逐页获取用户作品
+        
+        Args:
+            sec_user_id: 创作者ID
+            since_create_time: 增量模式下已爬取的最新发布时间，翻到不晚于该时间的作品时停止
+            max_cursor: 起始翻页游标
+        
+        Yields:
+            (本页作品列表, 下一页游标, 是否还有下一页)
+        """
         posts_has_more = 1
-        max_cursor = ""
-        result = []
         
         while posts_has_more == 1:
             aweme_post_res = await self.get_user_aweme_posts(sec_user_id, max_cursor)
@@ -221,51 +345,151 @@ class DouYinClient:
             max_cursor = aweme_post_res.get("max_cursor", "")
             aweme_list = aweme_post_res.get("aweme_list", [])
             
-            logger.info(f"获取用户 {sec_user_id} 的视频数量: {len(aweme_list)}")
-            
-            if callback:
-                await callback(aweme_list)
+            if since_create_time:
+                # 置顶作品不按发布时间排序，只用非置顶作品判断是否翻到已爬取的位置
+                reached = any(
+                    not aweme.get("is_top") and aweme.get("create_time", 0) <= since_create_time
+                    for aweme in aweme_list
+                )
+                aweme_list = [aweme for aweme in aweme_list if aweme.get("create_time", 0) > since_create_time]
+                if reached:
+                    logger.info(f"用户 {sec_user_id} 已翻到上次爬取的位置，停止翻页")
+                    posts_has_more = 0
             
-            result.extend(aweme_list)
-            await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-        
-        return result
+            logger.info(f"获取用户 {sec_user_id} 的视频数量: {len(aweme_list)}")
+            yield aweme_list, max_cursor, posts_has_more == 1
     
-    async def get_aweme_media(self, url: str) -> Union[bytes, None]:
-        """下载视频/图片"""
-        headers = {
+    def _media_headers(self) -> Dict:
+        """媒体下载请求头"""
+        return {
             "User-Agent": self.headers.get("User-Agent", "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36"),
             "Referer": "https://www.douyin.com/",
         }
+    
+    async def download_media(self, url: str, file_path: str) -> bool:
+        """
+        流式、可断点续传地下载视频/图片到文件
         
-        async with httpx.AsyncClient(proxy=self.proxy, headers=headers) as client:
-            try:
-                response = await client.get(url, timeout=self.timeout, follow_redirects=True)
-                response.raise_for_status()
-                
-                if response.reason_phrase != "OK":
-                    logger.error(f"下载媒体失败: {url}")
-                    return None
-                
-                return response.content
-            except httpx.HTTPError as exc:
-                logger.error(f"下载媒体异常: {exc}")
+        数据分块写入 file_path + ".part"，中断后保留该文件，下次通过 Range 请求
+        从已下载位置继续；完成并校验大小后原子重命名为 file_path。
+        file_path 已存在时视为已下载完成，直接跳过。
+        
+        Args:
+            url: 媒体URL
+            file_path: 保存路径
+        
+        Returns:
+            bool: 文件是否已完整保存
+        """
+        if os.path.exists(file_path):
+            logger.info(f"媒体文件已存在，跳过下载: {file_path}")
+            return True
+        
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        part_path = f"{file_path}.part"
+        
+        async def download():
+            # 416 表示续传位置无效，清空 .part 后从头下载一次
+            for _ in range(2):
+                result = await self._download_to_part(url, part_path)
+                if result is not None:
+                    return result
+            return False
+        
+        try:
+            # 失败重试时从 .part 断点继续
+            if not await self.retrier.call("media", download):
+                return False
+            
+            os.replace(part_path, file_path)
+            return True
+        except (httpx.HTTPError, OSError) as exc:
+            # 保留 .part 文件，下次从断点继续
+            logger.error(f"下载媒体异常（已保留未完成文件，下次续传）: {exc}")
+            return False
+    
+    async def _download_to_part(self, url: str, part_path: str) -> Optional[bool]:
+        """
+        将媒体下载/续传到 .part 文件
+        
+        Returns:
+            Optional[bool]: True 下载完整; False 失败; None 续传位置无效，需要从头下载
+        """
+        await self.rate_limiter.acquire("media")
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = self._media_headers()
+        # 禁止压缩，保证写入字节数与 Content-Length 一致
+        headers["Accept-Encoding"] = "identity"
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            logger.info(f"断点续传: {part_path} 已下载 {offset} 字节")
+        
+        async with self.media_client.stream(
+            "GET", url, headers=headers, timeout=self.timeout, follow_redirects=True
+        ) as response:
+            if response.status_code in self.retrier.policy("media").retry_statuses:
+                raise DataFetchError(f"HTTP {response.status_code}", status_code=response.status_code)
+            if response.status_code == 416:
+                total = self._parse_content_range_total(response.headers.get("Content-Range", ""))
+                if total is not None and total == offset:
+                    # .part 已经是完整文件
+                    return True
+                logger.warning(f"续传位置无效，重新下载: {part_path}")
+                os.remove(part_path)
                 return None
+            response.raise_for_status()
+            
+            if response.status_code == 206:
+                content_range = response.headers.get("Content-Range", "")
+                match = re.match(r"bytes (\d+)-\d+/", content_range)
+                if not match or int(match.group(1)) != offset:
+                    logger.warning(f"续传范围不匹配({content_range})，重新下载: {part_path}")
+                    os.remove(part_path)
+                    return None
+                expected_size = self._parse_content_range_total(content_range)
+                mode = "ab"
+            else:
+                # 服务器不支持 Range，从头写入
+                content_length = response.headers.get("Content-Length")
+                expected_size = int(content_length) if content_length else None
+                mode = "wb"
+            
+            with open(part_path, mode) as f:
+                async for chunk in response.aiter_bytes(config.MEDIA_CHUNK_SIZE):
+                    # 磁盘写入放到线程中，不阻塞事件循环
+                    await asyncio.to_thread(f.write, chunk)
+        
+        size = os.path.getsize(part_path)
+        if expected_size is not None and size != expected_size:
+            logger.error(f"媒体文件大小校验失败: {part_path}, 期望 {expected_size}, 实际 {size}")
+            if size > expected_size:
+                os.remove(part_path)
+            return False
+        return True
+    
+    @staticmethod
+    def _parse_content_range_total(content_range: str) -> Optional[int]:
+        """从 Content-Range 中解析文件总大小"""
+        match = re.search(r"/(\d+)$", content_range)
+        return int(match.group(1)) if match else None
     
     async def resolve_short_url(self, short_url: str) -> str:
         """解析短链接"""
-        async with httpx.AsyncClient(proxy=self.proxy, follow_redirects=False) as client:
-            try:
-                logger.info(f"正在解析短链接: {short_url}")
-                response = await client.get(short_url, timeout=10)
-                
-                if response.status_code in [301, 302, 303, 307, 308]:
-                    redirect_url = response.headers.get("Location", "")
-                    logger.info(f"短链接解析成功: {redirect_url}")
-                    return redirect_url
-                else:
-                    logger.warning(f"短链接状态码异常: {response.status_code}")
-                    return ""
-            except Exception as e:
-                logger.error(f"解析短链接失败: {e}")
+        async def send():
+            await self.rate_limiter.acquire("short_url")
+            return await self.http_client.get(short_url, timeout=10, follow_redirects=False)
+        
+        try:
+            logger.info(f"正在解析短链接: {short_url}")
+            response = await self.retrier.call("short_url", send)
+            
+            if response.status_code in [301, 302, 303, 307, 308]:
+                redirect_url = response.headers.get("Location", "")
+                logger.info(f"短链接解析成功: {redirect_url}")
+                return redirect_url
+            else:
+                logger.warning(f"短链接状态码异常: {response.status_code}")
                 return ""
+        except Exception as e:
+            logger.error(f"解析短链接失败: {e}")
+            return ""
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+自适应并发控制（AIMD）
+"""
+import asyncio
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from typing import Dict
+
+import config
+from crawler.rate_limiter import RateLimiter
+from utils import logger
+
+
+class AdaptiveConcurrencyController:
+    """
+    AIMD 并发控制器
+
+    响应正常时加性增加并发上限和请求速率；遇到风控、HTTP 429/5xx
+    或短时间内的连续请求失败时乘性降低，并把当前限制作为指标暴露。
+    """
+
+    # 单次出现即降速的信号
+    SEVERE_SIGNALS = ("blocked", "http_429")
+
+    def __init__(self, rate_limiter: RateLimiter = None, enabled: bool = None):
+        self.rate_limiter = rate_limiter
+        self.enabled = config.ENABLE_ADAPTIVE_CONCURRENCY if enabled is None else enabled
+        self.min_limit = config.ADAPTIVE_MIN_CONCURRENCY
+        self.max_limit = max(config.ADAPTIVE_MAX_CONCURRENCY, config.MAX_CONCURRENCY_NUM)
+        self.limit = float(config.MAX_CONCURRENCY_NUM)
+        self.rate_scale = 1.0
+
+        self._in_flight = 0
+        self._cond = asyncio.Condition()
+        self._consecutive_successes = 0
+        self._recent_errors: deque = deque()
+        self._last_decrease = 0.0
+
+        self.successes = 0
+        self.failures: Counter = Counter()
+        self.increases = 0
+        self.decreases = 0
+
+    @property
+    def current_limit(self) -> int:
+        """当前生效的并发上限"""
+        return max(1, int(self.limit))
+
+    @asynccontextmanager
+    async def slot(self):
+        """占用一个并发名额，超过当前上限时等待"""
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < self.current_limit)
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+
+    def record_success(self):
+        """记录一次正常响应：每连续成功一个并发窗口，上限加一"""
+        self.successes += 1
+        if not self.enabled:
+            return
+        self._consecutive_successes += 1
+        if self._consecutive_successes < self.current_limit:
+            return
+        self._consecutive_successes = 0
+
+        if self.limit < self.max_limit or self.rate_scale < config.ADAPTIVE_MAX_RATE_SCALE:
+            self.limit = min(self.max_limit, self.limit + 1)
+            self.rate_scale = min(config.ADAPTIVE_MAX_RATE_SCALE, self.rate_scale + config.ADAPTIVE_RATE_STEP)
+            self.increases += 1
+            self._apply()
+
+    def record_failure(self, signal: str):
+        """
+        记录一次异常响应
+
+        Args:
+            signal: blocked | http_429 | http_5xx | fetch_error
+        """
+        self.failures[signal] += 1
+        if not self.enabled:
+            return
+        self._consecutive_successes = 0
+
+        now = time.monotonic()
+        if signal not in self.SEVERE_SIGNALS:
+            # 普通错误只有在窗口内集中出现时才降速
+            self._recent_errors.append(now)
+            while self._recent_errors and now - self._recent_errors[0] > config.ADAPTIVE_ERROR_WINDOW_SEC:
+                self._recent_errors.popleft()
+            if len(self._recent_errors) < config.ADAPTIVE_ERROR_BURST:
+                return
+
+        # 同一次风控往往触发多个并发请求失败，冷却期内只降一次
+        if now - self._last_decrease < config.ADAPTIVE_COOLDOWN_SEC:
+            return
+        self._last_decrease = now
+        self._recent_errors.clear()
+
+        self.limit = max(self.min_limit, self.limit * config.ADAPTIVE_DECREASE_FACTOR)
+        self.rate_scale = max(config.ADAPTIVE_MIN_RATE_SCALE, self.rate_scale * config.ADAPTIVE_DECREASE_FACTOR)
+        self.decreases += 1
+        self._apply()
+        logger.warning(
+            f"[AdaptiveConcurrency] 检测到 {signal}，降低并发上限至 {self.current_limit}，"
+            f"速率倍率 {self.rate_scale:.2f}"
+        )
+
+    def _apply(self):
+        """把速率倍率同步到限速器，并唤醒等待名额的请求"""
+        if self.rate_limiter:
+            # 媒体下载走 CDN，不受接口风控影响
+            self.rate_limiter.set_scale(self.rate_scale, exclude=("media",))
+        asyncio.ensure_future(self._notify())
+
+    async def _notify(self):
+        async with self._cond:
+            self._cond.notify_all()
+
+    def metrics(self) -> Dict:
+        """当前限制和计数指标"""
+        return {
+            "enabled": self.enabled,
+            "concurrency_limit": self.current_limit,
+            "in_flight": self._in_flight,
+            "rate_scale": round(self.rate_scale, 3),
+            "successes": self.successes,
+            "failures": dict(self.failures),
+            "increases": self.increases,
+            "decreases": self.decreases,
+            "rates": self.rate_limiter.rates() if self.rate_limiter else {},
+        }
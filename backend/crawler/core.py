@@ -4,15 +4,17 @@
 """
 import asyncio
 import os
-import random
-from typing import Dict, List
+import urllib.parse
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
 
 from playwright.async_api import BrowserType, BrowserContext, Page, Playwright, async_playwright
 
 import config
-from database import douyin_store
-from utils import logger, parse_video_info_from_url, parse_creator_info_from_url, convert_cookies
-from crawler import DouYinClient, DouYinLogin, PublishTimeType, DataFetchError
+from database import douyin_store, seen_awemes
+from utils import logger, parse_video_info_from_url, parse_creator_info_from_url, convert_cookies, douyin_signer
+from crawler import DouYinClient, DouYinLogin, MediaDownloader, DetailWorkerPool, PublishTimeType, DataFetchError
 
 
 class DouYinCrawler:
@@ -23,11 +25,29 @@ class DouYinCrawler:
         self.browser_context: BrowserContext = None
         self.context_page: Page = None
         self.dy_client: DouYinClient = None
+        # 关键词搜索进度: {关键词: {"status", "pages", "videos"}}
+        self.keyword_progress: Dict[str, Dict] = {}
+        # 创作者爬取进度: {sec_user_id: {"status", "pages", "videos", "failed_videos"}}
+        self.creator_progress: Dict[str, Dict] = {}
+        # 媒体下载与元数据爬取解耦，由独立的下载协程池完成
+        self.media_downloader = MediaDownloader(handler=self.download_aweme_media)
+        # 按媒体 uri 加锁，避免同一媒体被并发重复下载: {uri: [锁, 持有及等待的任务数]}
+        # 没有任务使用时删除，字典大小只与正在下载的媒体数有关
+        self._media_locks: Dict[str, list] = {}
+        # 已保存作品的去重计数: {"skipped", "refreshed", "recrawled", "media_queued"}
+        self.dedup_counts: Counter = Counter()
     
     async def start(self):
         """启动爬虫"""
         logger.info("[DouYinCrawler] 启动抖音爬虫...")
         
+        # 启动浏览器的同时在后台预编译签名JS
+        sign_warm_up_task = asyncio.create_task(douyin_signer.warm_up())
+        # 同时在后台加载已保存的作品ID
+        seen_load_task = None
+        if config.DEDUP_POLICY != "none":
+            seen_load_task = asyncio.create_task(asyncio.to_thread(seen_awemes.load))
+        
         async with async_playwright() as playwright:
             # 启动浏览器
             chromium = playwright.chromium
@@ -63,6 +83,9 @@ class DouYinCrawler:
                 await self.dy_client.update_cookies(browser_context=self.browser_context)
             
             logger.info(f"[DouYinCrawler] 登录成功！开始执行爬取任务...")
+            await sign_warm_up_task
+            if seen_load_task:
+                await seen_load_task
             
             # 使用配置中的值
             crawler_type = config.CRAWLER_TYPE
@@ -78,7 +101,10 @@ class DouYinCrawler:
             else:
                 logger.error(f"[DouYinCrawler] 不支持的爬取类型: {crawler_type}")
             
-            logger.info("[DouYinCrawler] 爬取任务完成！")
+            # 等待排队中的媒体下载完成
+            await self.media_downloader.close()
+            
+            logger.info(f"[DouYinCrawler] 爬取任务完成！运行指标: {self.get_metrics()}")
     
     async def search(self):
         """模式1: 关键词搜索"""
@@ -88,16 +114,143 @@ class DouYinCrawler:
         if config.CRAWLER_MAX_NOTES_COUNT < dy_limit_count:
             config.CRAWLER_MAX_NOTES_COUNT = dy_limit_count
         
-        start_page = config.START_PAGE
+        keywords = [keyword.strip() for keyword in config.KEYWORDS.split(",") if keyword.strip()]
+        self.keyword_progress = {
+            keyword: {"status": "pending", "pages": 0, "videos": 0}
+            for keyword in keywords
+        }
+        
+        if not config.RESUME_CRAWL:
+            await douyin_store.clear_checkpoints("search")
+        
+        # 关键词作为独立任务由多个协程并行处理，共享客户端和限速器
+        keyword_queue: asyncio.Queue = asyncio.Queue()
+        for keyword in keywords:
+            checkpoint = douyin_store.get_checkpoint("search", keyword) if config.RESUME_CRAWL else None
+            if checkpoint and checkpoint.get("done"):
+                logger.info(f"[DouYinCrawler] 关键词 {keyword} 已在上次运行中完成，跳过")
+                self.keyword_progress[keyword]["status"] = "done"
+                continue
+            keyword_queue.put_nowait(keyword)
+        
+        worker_num = max(1, min(config.KEYWORD_WORKER_NUM, len(keywords)))
+        await asyncio.gather(*[
+            self._keyword_worker(keyword_queue)
+            for _ in range(worker_num)
+        ])
+        
+        total_videos = sum(progress["videos"] for progress in self.keyword_progress.values())
+        failed = [keyword for keyword, progress in self.keyword_progress.items() if progress["status"] == "failed"]
+        logger.info(f"[DouYinCrawler] 关键词搜索完成: {len(keywords)} 个关键词，共 {total_videos} 个视频，失败 {len(failed)} 个 {failed}")
         
-        for keyword in config.KEYWORDS.split(","):
-            keyword = keyword.strip()
+        # 全部关键词都完整结束后断点不再需要，失败的关键词保留断点供 --resume 继续
+        if not failed:
+            await douyin_store.clear_checkpoints("search")
+    
+    async def _keyword_worker(self, keyword_queue: asyncio.Queue):
+        """关键词协程：循环取出关键词并完成搜索"""
+        while True:
+            try:
+                keyword = keyword_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            
+            progress = self.keyword_progress[keyword]
+            progress["status"] = "running"
             logger.info(f"[DouYinCrawler] 当前搜索关键词: {keyword}")
             
-            aweme_list: List[str] = []
-            page = 0
-            dy_search_id = ""
+            try:
+                aweme_count = await self.search_keyword(keyword)
+            except Exception as e:
+                progress["status"] = "failed"
+                logger.error(f"[DouYinCrawler] 关键词 {keyword} 爬取失败: {e}")
+                continue
+            
+            finished = sum(1 for item in self.keyword_progress.values() if item["status"] in ("done", "failed")) + 1
+            if not progress["complete"]:
+                # 翻页中途出错，断点保留在最后处理完的页，供 --resume 继续
+                progress["status"] = "failed"
+                logger.error(
+                    f"[DouYinCrawler] 关键词 {keyword} 爬取未完成，已处理 {aweme_count} 个视频 "
+                    f"(进度 {finished}/{len(self.keyword_progress)})"
+                )
+                continue
+            
+            progress["status"] = "done"
+            logger.info(
+                f"[DouYinCrawler] 关键词 {keyword} 爬取完成，共 {aweme_count} 个视频 "
+                f"(进度 {finished}/{len(self.keyword_progress)})"
+            )
+    
+    async def search_keyword(self, keyword: str) -> int:
+        """
+        搜索单个关键词
+        
+        翻页协程在拿到 search_id 后立即请求下一页（最多预取 SEARCH_PREFETCH_PAGES 页），
+        当前协程同时处理已取回页面的结果。
+        
+        Args:
+            keyword: 搜索关键词
+        
+        Returns:
+            int: 处理的视频数量
+        """
+        progress = self.keyword_progress.setdefault(keyword, {"status": "running", "pages": 0, "videos": 0})
+        page_queue: asyncio.Queue = asyncio.Queue(maxsize=config.SEARCH_PREFETCH_PAGES)
+        fetcher = asyncio.create_task(self._fetch_search_pages(keyword, page_queue))
+        
+        aweme_count = 0
+        next_page, dy_search_id = 0, ""
+        try:
+            while True:
+                item = await page_queue.get()
+                if item is None:
+                    break
+                
+                next_page, dy_search_id, aweme_list = item
+                for aweme_info in aweme_list:
+                    aweme_count += 1
+                    progress["videos"] += 1
+                    if await self.handle_seen_aweme(aweme_info):
+                        continue
+                    # 保存视频数据并下载媒体文件
+                    await self.save_aweme(aweme_info, keyword=keyword)
+                
+                # 本页结果已提交保存后才推进断点（预取但未处理的页不计入）
+                await douyin_store.save_checkpoint(
+                    "search", keyword, {"page": next_page, "search_id": dy_search_id, "done": False}
+                )
             
+            progress["complete"] = await fetcher
+            if progress["complete"]:
+                await douyin_store.save_checkpoint(
+                    "search", keyword, {"page": next_page, "search_id": dy_search_id, "done": True}
+                )
+        finally:
+            fetcher.cancel()
+        
+        return aweme_count
+    
+    async def _fetch_search_pages(self, keyword: str, page_queue: asyncio.Queue) -> bool:
+        """
+        翻页协程：逐页搜索，把每页的 (下一页页码, search_id, 视频列表) 放入队列，结束时放入 None
+        
+        Returns:
+            bool: 是否正常翻到最后一页（出错中断时为 False）
+        """
+        dy_limit_count = 10  # 抖音每页固定返回10条
+        start_page = config.START_PAGE
+        page = 0
+        dy_search_id = ""
+        complete = False
+        
+        checkpoint = douyin_store.get_checkpoint("search", keyword) if config.RESUME_CRAWL else None
+        if checkpoint:
+            page = max(checkpoint.get("page", 0), start_page)
+            dy_search_id = checkpoint.get("search_id", "")
+            logger.info(f"[DouYinCrawler] 关键词 {keyword} 从断点继续: 第 {page} 页")
+        
+        try:
             while (page - start_page + 1) * dy_limit_count <= config.CRAWLER_MAX_NOTES_COUNT:
                 if page < start_page:
                     logger.info(f"[DouYinCrawler] 跳过第 {page} 页")
@@ -115,6 +268,7 @@ class DouYinCrawler:
                     
                     if not posts_res.get("data"):
                         logger.info(f"[DouYinCrawler] 第 {page} 页无数据，结束搜索")
+                        complete = True
                         break
                 
                 except DataFetchError:
@@ -129,7 +283,8 @@ class DouYinCrawler:
                 
                 dy_search_id = posts_res.get("extra", {}).get("logid", "")
                 
-                # 处理搜索结果
+                # 提取搜索结果
+                aweme_list: List[Dict] = []
                 for post_item in posts_res.get("data", []):
                     try:
                         aweme_info: Dict = (
@@ -139,127 +294,458 @@ class DouYinCrawler:
                     except (TypeError, IndexError):
                         continue
                     
-                    aweme_id = aweme_info.get("aweme_id", "")
-                    if aweme_id:
-                        aweme_list.append(aweme_id)
-                        # 保存视频数据
-                        await douyin_store.save_video(aweme_info, keyword=keyword)
-                        # 下载媒体文件
-                        await self.get_aweme_media(aweme_info)
+                    if aweme_info.get("aweme_id", ""):
+                        aweme_list.append(aweme_info)
                 
-                # 页面间隔
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                logger.info(f"[DouYinCrawler] 等待 {config.CRAWLER_MAX_SLEEP_SEC} 秒后继续...")
-            
-            logger.info(f"[DouYinCrawler] 关键词 {keyword} 爬取完成，共 {len(aweme_list)} 个视频")
+                self.keyword_progress[keyword]["pages"] += 1
+                await page_queue.put((page, dy_search_id, aweme_list))
+            else:
+                # 达到最大爬取数量
+                complete = True
+        except Exception as e:
+            logger.error(f"[DouYinCrawler] 搜索关键词 {keyword} 出错: {e}")
+        
+        await page_queue.put(None)
+        return complete
     
     async def get_specified_awemes(self):
         """模式2: 指定视频ID/URL爬取"""
         logger.info("[DouYinCrawler] 开始指定视频爬取模式...")
         
-        aweme_id_list = []
+        # 断点: "ids" 保存一次完整的视频ID列表，之后每完成一批只追加一条 "done:<序号>" 记录这批完成的ID
+        checkpoints = douyin_store.get_checkpoints("detail") if config.RESUME_CRAWL else {}
+        if "ids" in checkpoints:
+            done_ids = set()
+            for key, state in checkpoints.items():
+                if key.startswith("done:"):
+                    done_ids.update(state.get("done", []))
+            aweme_id_list = [aweme_id for aweme_id in checkpoints["ids"].get("ids", []) if aweme_id not in done_ids]
+            done_batches = len(checkpoints) - 1
+            logger.info(f"[DouYinCrawler] 从断点继续: 剩余 {len(aweme_id_list)} 个视频")
+        else:
+            aweme_id_list = await self._parse_specified_aweme_ids()
+            await douyin_store.clear_checkpoints("detail")
+            await douyin_store.save_checkpoint("detail", "ids", {"ids": aweme_id_list})
+            done_batches = 0
+        
+        # 详情协程池流式处理：每个视频获取后立即保存，处理中的任务数有上限
+        # （实际请求并发由客户端的自适应控制器管理）
+        total = len(aweme_id_list)
+        finished = 0
+        done_batch: List[str] = []
+        
+        async def save_done_batch():
+            nonlocal done_batches
+            if not done_batch:
+                return
+            done_batches += 1
+            batch = done_batch.copy()
+            done_batch.clear()
+            await douyin_store.save_checkpoint("detail", f"done:{done_batches}", {"done": batch})
+        
+        async def fetch_and_save(aweme_id: str):
+            nonlocal finished
+            aweme_detail = await self.get_aweme_detail(aweme_id=aweme_id)
+            if not aweme_detail:
+                # 失败的视频不记入已完成，下次 --resume 时重试
+                return
+            await self.save_aweme(aweme_detail)
+            finished += 1
+            done_batch.append(aweme_id)
+            if finished % config.CHECKPOINT_DETAIL_INTERVAL == 0:
+                logger.info(f"[DouYinCrawler] 指定视频进度: {finished}/{total}")
+                await save_done_batch()
         
+        detail_pool = DetailWorkerPool(handler=fetch_and_save)
+        for aweme_id in aweme_id_list:
+            await detail_pool.submit(aweme_id)
+        await detail_pool.close()
+        
+        failed = total - finished
+        if failed:
+            await save_done_batch()
+        else:
+            await douyin_store.clear_checkpoints("detail")
+        
+        logger.info(f"[DouYinCrawler] 指定视频爬取完成，共 {total} 个视频，失败 {failed} 个")
+    
+    async def _parse_specified_aweme_ids(self) -> List[str]:
+        """解析 DY_SPECIFIED_ID_LIST 中的视频ID/URL（含短链接），按输入顺序去重"""
+        parsed = []
         for video_url in config.DY_SPECIFIED_ID_LIST:
             try:
-                video_info = parse_video_info_from_url(video_url)
-                
-                # 处理短链接
-                if video_info.url_type == "short":
-                    logger.info(f"[DouYinCrawler] 解析短链接: {video_url}")
-                    resolved_url = await self.dy_client.resolve_short_url(video_url)
-                    
-                    if resolved_url:
-                        video_info = parse_video_info_from_url(resolved_url)
-                        logger.info(f"[DouYinCrawler] 短链接解析成功: {video_info.aweme_id}")
-                    else:
-                        logger.error(f"[DouYinCrawler] 短链接解析失败: {video_url}")
-                        continue
-                
-                aweme_id_list.append(video_info.aweme_id)
-                logger.info(f"[DouYinCrawler] 解析视频ID: {video_info.aweme_id}")
-                
+                parsed.append((video_url, parse_video_info_from_url(video_url)))
             except ValueError as e:
                 logger.error(f"[DouYinCrawler] 解析视频URL失败: {e}")
-                continue
         
-        # 并发获取视频详情
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
-        tasks = [
-            self.get_aweme_detail(aweme_id=aweme_id, semaphore=semaphore)
-            for aweme_id in aweme_id_list
-        ]
-        aweme_details = await asyncio.gather(*tasks)
+        # 短链接先查缓存，未缓存的并发解析
+        short_urls = list(dict.fromkeys(url for url, info in parsed if info.url_type == "short"))
+        resolved = await self.resolve_short_urls(short_urls)
         
-        # 保存数据
-        for aweme_detail in aweme_details:
-            if aweme_detail:
-                await douyin_store.save_video(aweme_detail)
-                await self.get_aweme_media(aweme_detail)
+        aweme_id_list = []
+        for video_url, video_info in parsed:
+            aweme_id = resolved.get(video_url) if video_info.url_type == "short" else video_info.aweme_id
+            if aweme_id:
+                aweme_id_list.append(aweme_id)
         
-        logger.info(f"[DouYinCrawler] 指定视频爬取完成，共 {len(aweme_id_list)} 个视频")
+        aweme_id_list = list(dict.fromkeys(aweme_id_list))
+        logger.info(f"[DouYinCrawler] 解析视频ID完成: 输入 {len(config.DY_SPECIFIED_ID_LIST)} 个，去重后 {len(aweme_id_list)} 个")
+        return aweme_id_list
+    
+    async def resolve_short_urls(self, short_urls: List[str]) -> Dict[str, str]:
+        """
+        解析短链接为视频ID，优先使用数据库缓存
+        
+        Args:
+            short_urls: 短链接列表（已去重）
+        
+        Returns:
+            Dict: {短链接: 视频ID}，解析失败的不包含在结果中
+        """
+        resolved = douyin_store.get_short_url_aweme_ids(short_urls)
+        missing = [url for url in short_urls if url not in resolved]
+        if resolved:
+            logger.info(f"[DouYinCrawler] 短链接缓存命中 {len(resolved)} 个，需要解析 {len(missing)} 个")
+        
+        semaphore = asyncio.Semaphore(config.SHORT_URL_RESOLVE_CONCURRENCY)
+        new_mapping: Dict[str, str] = {}
+        
+        async def resolve(short_url: str):
+            async with semaphore:
+                resolved_url = await self.dy_client.resolve_short_url(short_url)
+            if not resolved_url:
+                logger.error(f"[DouYinCrawler] 短链接解析失败: {short_url}")
+                return
+            try:
+                aweme_id = parse_video_info_from_url(resolved_url).aweme_id
+            except ValueError as e:
+                logger.error(f"[DouYinCrawler] 短链接跳转地址无法解析: {short_url} -> {resolved_url}, {e}")
+                return
+            if aweme_id:
+                new_mapping[short_url] = aweme_id
+        
+        await asyncio.gather(*[resolve(url) for url in missing])
+        await douyin_store.save_short_urls(new_mapping)
+        
+        resolved.update(new_mapping)
+        return resolved
     
     async def get_creators_and_videos(self):
         """模式3: 创作者主页爬取"""
         logger.info("[DouYinCrawler] 开始创作者主页爬取模式...")
         
+        if not config.RESUME_CRAWL:
+            await douyin_store.clear_checkpoints("creator")
+        
+        sec_user_ids = []
         for creator_url in config.DY_CREATOR_ID_LIST:
             try:
                 creator_info_parsed = parse_creator_info_from_url(creator_url)
-                sec_user_id = creator_info_parsed.sec_user_id
-                logger.info(f"[DouYinCrawler] 解析创作者ID: {sec_user_id}")
+                sec_user_ids.append(creator_info_parsed.sec_user_id)
+                logger.info(f"[DouYinCrawler] 解析创作者ID: {creator_info_parsed.sec_user_id}")
                 
             except ValueError as e:
                 logger.error(f"[DouYinCrawler] 解析创作者URL失败: {e}")
                 continue
+        
+        sec_user_ids = list(dict.fromkeys(sec_user_ids))
+        self.creator_progress = {
+            sec_user_id: {"status": "pending", "pages": 0, "videos": 0, "failed_videos": 0}
+            for sec_user_id in sec_user_ids
+        }
+        if not sec_user_ids:
+            return
+        
+        # 创作者轮流翻页：队列先进先出，每次取出一个创作者翻一页后放回队尾，
+        # 作品很多的创作者不会阻塞其他创作者；所有翻页共享同一个限速器
+        creator_queue: asyncio.Queue = asyncio.Queue()
+        for sec_user_id in sec_user_ids:
+            creator_queue.put_nowait(sec_user_id)
+        
+        # 整个爬取过程共用一个详情协程池：翻页只负责提交作品，下一页的请求与上一页的详情获取重叠
+        detail_pool = DetailWorkerPool(handler=self.process_creator_post)
+        worker_num = max(1, min(config.CREATOR_WORKER_NUM, len(sec_user_ids)))
+        workers = [
+            asyncio.create_task(self._creator_worker(creator_queue, detail_pool))
+            for _ in range(worker_num)
+        ]
+        try:
+            # 创作者放回队尾后才标记完成，队列清空即所有创作者翻页结束
+            await creator_queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            # 等待已提交的作品处理完，断点推进到实际完成的位置
+            await detail_pool.close()
+        
+        failed = [sec_user_id for sec_user_id, progress in self.creator_progress.items() if progress["status"] == "failed"]
+        total_videos = sum(progress["videos"] for progress in self.creator_progress.values())
+        logger.info(f"[DouYinCrawler] 创作者爬取完成: {len(sec_user_ids)} 个创作者，共 {total_videos} 个视频，失败 {len(failed)} 个 {failed}")
+        
+        # 失败的创作者保留断点，供 --resume 继续
+        if not failed:
+            await douyin_store.clear_checkpoints("creator")
+    
+    async def _creator_worker(self, creator_queue: asyncio.Queue, detail_pool: DetailWorkerPool):
+        """翻页协程：循环取出一个创作者，处理一轮（首轮准备，之后每轮翻一页）后放回队尾"""
+        while True:
+            creator = await creator_queue.get()
+            sec_user_id = creator if isinstance(creator, str) else creator["sec_user_id"]
+            progress = self.creator_progress[sec_user_id]
+            try:
+                if isinstance(creator, str):
+                    progress["status"] = "running"
+                    creator = await self.prepare_creator(sec_user_id)
+                    has_more = creator is not None
+                    if creator is None:
+                        progress["status"] = "done"
+                else:
+                    has_more = await self.creator_turn(creator, detail_pool)
+            except Exception as e:
+                progress["status"] = "failed"
+                logger.error(f"[DouYinCrawler] 创作者 {sec_user_id} 爬取失败: {e}")
+                has_more = False
             
-            # 获取创作者信息
-            creator_info: Dict = await self.dy_client.get_user_info(sec_user_id)
-            if creator_info:
-                await douyin_store.save_creator(sec_user_id, creator_info)
-            
-            # 获取创作者所有视频
-            all_video_list = await self.dy_client.get_all_user_aweme_posts(
-                sec_user_id=sec_user_id,
-                callback=self.fetch_creator_video_detail
+            if has_more:
+                creator_queue.put_nowait(creator)
+            creator_queue.task_done()
+    
+    async def prepare_creator(self, sec_user_id: str) -> Optional[Dict]:
+        """
+        读取断点和增量位置，保存创作者信息
+        
+        Returns:
+            Dict: 创作者爬取状态，上次运行已完成时返回 None
+        """
+        checkpoint = douyin_store.get_checkpoint("creator", sec_user_id) if config.RESUME_CRAWL else None
+        checkpoint = checkpoint or {"max_cursor": "", "newest_create_time": 0, "done": False}
+        # 保存失败作品中最早的发布时间，增量位置不能越过它
+        checkpoint.setdefault("oldest_failed_create_time", 0)
+        if checkpoint["done"]:
+            logger.info(f"[DouYinCrawler] 创作者 {sec_user_id} 已在上次运行中完成，跳过")
+            return None
+        if checkpoint["max_cursor"]:
+            logger.info(f"[DouYinCrawler] 创作者 {sec_user_id} 从断点继续: max_cursor={checkpoint['max_cursor']}")
+        
+        # 获取创作者信息
+        creator_info: Dict = await self.dy_client.get_user_info(sec_user_id)
+        if creator_info:
+            await douyin_store.save_creator(sec_user_id, creator_info)
+        
+        # 增量模式：只爬取上次爬取之后发布的作品
+        since_create_time = 0
+        if config.ENABLE_INCREMENTAL_CREATOR:
+            since_create_time = douyin_store.get_creator_newest_create_time(sec_user_id)
+            if since_create_time:
+                logger.info(f"[DouYinCrawler] 增量爬取创作者 {sec_user_id}，上次最新作品时间: {since_create_time}")
+        
+        return {
+            "sec_user_id": sec_user_id,
+            "checkpoint": checkpoint,
+            "since_create_time": since_create_time,
+            # 已提交但未处理完的页: [{"cursor", "newest", "remaining", "oldest_failed"}]，按翻页顺序
+            "pages": deque(),
+            "pages_iter": None,
+            "paging_done": False,
+            "finished": False,
+        }
+    
+    async def creator_turn(self, creator: Dict, detail_pool: DetailWorkerPool) -> bool:
+        """
+        为创作者翻一页并把作品提交到详情协程池
+        
+        Returns:
+            bool: 是否还有下一页
+        """
+        if creator["pages_iter"] is None:
+            creator["pages_iter"] = self.dy_client.iter_user_aweme_posts(
+                creator["sec_user_id"],
+                since_create_time=creator["since_create_time"],
+                max_cursor=creator["checkpoint"]["max_cursor"]
             )
-            
-            logger.info(f"[DouYinCrawler] 创作者 {sec_user_id} 爬取完成，共 {len(all_video_list)} 个视频")
-    
-    async def fetch_creator_video_detail(self, video_list: List[Dict]):
-        """并发获取创作者视频详情"""
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
-        tasks = [
-            self.get_aweme_detail(post_item.get("aweme_id"), semaphore)
-            for post_item in video_list
-        ]
         
-        note_details = await asyncio.gather(*tasks)
+        try:
+            aweme_list, max_cursor, has_more = await creator["pages_iter"].__anext__()
+        except StopAsyncIteration:
+            aweme_list, max_cursor, has_more = [], "", False
         
-        for aweme_item in note_details:
+        self.creator_progress[creator["sec_user_id"]]["pages"] += 1
+        await self.submit_creator_page(creator, aweme_list, max_cursor if has_more else "", detail_pool)
+        
+        if not has_more:
+            await creator["pages_iter"].aclose()
+            creator["paging_done"] = True
+            await self.advance_creator_checkpoint(creator)
+        return has_more
+    
+    async def submit_creator_page(self, creator: Dict, aweme_list: List[Dict], next_cursor: str,
+                                  detail_pool: DetailWorkerPool):
+        """提交一页作品，已保存过的作品按去重策略直接处理"""
+        posts = [post_item for post_item in aweme_list if not await self.handle_seen_aweme(post_item)]
+        page = {
+            "cursor": next_cursor,
+            "newest": max([aweme.get("create_time", 0) for aweme in aweme_list], default=0),
+            "remaining": len(posts),
+            "oldest_failed": 0,
+        }
+        creator["pages"].append(page)
+        self.creator_progress[creator["sec_user_id"]]["videos"] += len(aweme_list)
+        
+        for post_item in posts:
+            await detail_pool.submit((creator, page, post_item))
+        if not posts:
+            await self.advance_creator_checkpoint(creator)
+    
+    async def process_creator_post(self, task: tuple):
+        """详情协程：保存创作者的一个作品（列表数据完整时直接使用，否则获取视频详情）"""
+        creator, page, post_item = task
+        saved = False
+        try:
+            aweme_item = await self.get_creator_aweme_item(post_item)
             if aweme_item:
-                await douyin_store.save_video(aweme_item)
-                await self.get_aweme_media(aweme_item)
+                await self.save_aweme(aweme_item)
+                saved = True
+        finally:
+            if not saved:
+                # 记录失败作品的发布时间，下次增量爬取时重新获取
+                self.creator_progress[creator["sec_user_id"]]["failed_videos"] += 1
+                create_time = post_item.get("create_time", 0) or 1
+                page["oldest_failed"] = min(page["oldest_failed"] or create_time, create_time)
+            page["remaining"] -= 1
+            await self.advance_creator_checkpoint(creator)
+    
+    async def advance_creator_checkpoint(self, creator: Dict):
+        """前面的页全部处理完后推进断点；翻页结束且全部处理完时记录增量位置"""
+        sec_user_id = creator["sec_user_id"]
+        checkpoint = creator["checkpoint"]
+        pages = creator["pages"]
+        
+        advanced = False
+        while pages and pages[0]["remaining"] == 0:
+            page = pages.popleft()
+            checkpoint["newest_create_time"] = max(checkpoint["newest_create_time"], page["newest"])
+            if page["oldest_failed"]:
+                checkpoint["oldest_failed_create_time"] = min(
+                    checkpoint["oldest_failed_create_time"] or page["oldest_failed"], page["oldest_failed"]
+                )
+            if page["cursor"]:
+                checkpoint["max_cursor"] = page["cursor"]
+            advanced = True
+        
+        if creator["paging_done"] and not pages and not creator["finished"]:
+            creator["finished"] = True
+            # 完整翻页后才更新位置，中途失败时下次仍从头补齐（断点中保留了之前已翻过页面的最新时间）；
+            # 有作品保存失败时位置停在最早的失败作品之前，下次增量爬取会重新获取它
+            newest_create_time = checkpoint["newest_create_time"]
+            if checkpoint["oldest_failed_create_time"]:
+                newest_create_time = min(newest_create_time, checkpoint["oldest_failed_create_time"] - 1)
+            if newest_create_time > creator["since_create_time"]:
+                await douyin_store.save_creator_crawl_state(sec_user_id, newest_create_time)
+            checkpoint["done"] = True
+            await douyin_store.save_checkpoint("creator", sec_user_id, checkpoint)
+            progress = self.creator_progress[sec_user_id]
+            progress["status"] = "done"
+            finished = sum(1 for item in self.creator_progress.values() if item["status"] in ("done", "failed"))
+            logger.info(
+                f"[DouYinCrawler] 创作者 {sec_user_id} 爬取完成，共 {progress['videos']} 个视频，"
+                f"保存失败 {progress['failed_videos']} 个 (进度 {finished}/{len(self.creator_progress)})"
+            )
+        elif advanced:
+            await douyin_store.save_checkpoint("creator", sec_user_id, checkpoint)
     
-    async def get_aweme_detail(self, aweme_id: str, semaphore: asyncio.Semaphore):
+    async def save_aweme(self, aweme_item: Dict, keyword: str = ""):
+        """保存作品数据，并放入媒体下载队列"""
+        await douyin_store.save_video(aweme_item, keyword=keyword)
+        seen_awemes.add(aweme_item.get("aweme_id"))
+        await self.get_aweme_media(aweme_item)
+    
+    async def handle_seen_aweme(self, aweme_item: Dict) -> bool:
+        """
+        按 DEDUP_POLICY 处理已保存过的作品
+        
+        Returns:
+            bool: True 表示已处理完毕，不需要再获取详情、保存和下载媒体
+        """
+        policy = config.DEDUP_POLICY
+        aweme_id = aweme_item.get("aweme_id")
+        if policy == "none" or not seen_awemes.contains(aweme_id):
+            return False
+        
+        if policy == "refresh_stats":
+            if await douyin_store.refresh_video_stats(aweme_item):
+                self.dedup_counts["refreshed"] += 1
+            else:
+                self.dedup_counts["skipped"] += 1
+            await self.get_missing_media(aweme_item)
+            return True
+        
+        if policy == "refresh_after_age" and seen_awemes.age(aweme_id) >= config.DEDUP_REFRESH_AGE_SEC:
+            self.dedup_counts["recrawled"] += 1
+            return False
+        
+        self.dedup_counts["skipped"] += 1
+        await self.get_missing_media(aweme_item)
+        return True
+    
+    async def get_missing_media(self, aweme_item: Dict):
+        """已保存过的作品还没有媒体文件时（例如之前未开启 ENABLE_GET_MEDIA）补充下载"""
+        if config.ENABLE_GET_MEDIA and not douyin_store.has_media_files(aweme_item.get("aweme_id")):
+            self.dedup_counts["media_queued"] += 1
+            await self.get_aweme_media(aweme_item)
+    
+    async def get_creator_aweme_item(self, post_item: Dict) -> Optional[Dict]:
+        """返回可保存的作品数据，作品列表数据缺少必需字段时回退到详情接口，详情也获取失败时返回 None"""
+        aweme_id = post_item.get("aweme_id")
+        if config.ENABLE_CREATOR_LIST_PAYLOAD:
+            missing_fields = self._missing_fields(post_item)
+            if not missing_fields:
+                return post_item
+            logger.info(f"[DouYinCrawler] 作品 {aweme_id} 列表数据缺少字段 {missing_fields}，获取视频详情")
+        
+        # 详情获取失败或返回空数据时不保存不完整的列表数据（避免覆盖已有的完整记录），
+        # 作品按失败处理，增量位置停在它之前，下次重新获取
+        return await self.get_aweme_detail(aweme_id) or None
+    
+    @staticmethod
+    def _missing_fields(aweme_item: Dict) -> List[str]:
+        """检查 CREATOR_DETAIL_REQUIRED_FIELDS 中缺失的字段"""
+        def has_field(path: str) -> bool:
+            value = aweme_item
+            for key in path.split("."):
+                if not isinstance(value, dict) or key not in value:
+                    return False
+                value = value[key]
+            return value is not None and value != [] and value != {}
+        
+        return [
+            field for field in config.CREATOR_DETAIL_REQUIRED_FIELDS
+            if not any(has_field(path) for path in field.split("|"))
+        ]
+    
+    async def get_aweme_detail(self, aweme_id: str):
         """获取视频详情"""
-        async with semaphore:
-            try:
-                result = await self.dy_client.get_video_by_id(aweme_id)
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                logger.info(f"[DouYinCrawler] 获取视频详情成功: {aweme_id}")
-                return result
-            except DataFetchError as ex:
-                logger.error(f"[DouYinCrawler] 获取视频详情失败: {ex}")
-                return None
-            except KeyError as ex:
-                logger.error(f"[DouYinCrawler] 视频不存在: {aweme_id}, {ex}")
-                return None
+        try:
+            result = await self.dy_client.get_video_by_id(aweme_id)
+            logger.info(f"[DouYinCrawler] 获取视频详情成功: {aweme_id}")
+            return result
+        except DataFetchError as ex:
+            logger.error(f"[DouYinCrawler] 获取视频详情失败: {ex}")
+            return None
+        except KeyError as ex:
+            logger.error(f"[DouYinCrawler] 视频不存在: {aweme_id}, {ex}")
+            return None
     
     async def get_aweme_media(self, aweme_item: Dict):
-        """下载视频/图片"""
+        """将视频/图片下载任务放入下载队列"""
         if not config.ENABLE_GET_MEDIA:
             return
         
+        if aweme_item.get("aweme_id"):
+            await self.media_downloader.submit(aweme_item)
+    
+    async def download_aweme_media(self, aweme_item: Dict):
+        """下载视频/图片（由下载协程调用）"""
         aweme_id = aweme_item.get("aweme_id", "")
         if not aweme_id:
             return
@@ -275,27 +761,28 @@ class DouYinCrawler:
             await self.get_aweme_video(aweme_item)
     
     async def get_aweme_images(self, aweme_item: Dict):
-        """下载图片"""
+        """并发下载图文作品的所有图片"""
         aweme_id = aweme_item.get("aweme_id", "")
         images = aweme_item.get("images", [])
         
         if not images:
             return
         
+        # 单个作品内的并发上限，全局并发和速率由下载器与限速器控制
+        semaphore = asyncio.Semaphore(config.MEDIA_IMAGE_CONCURRENCY_PER_POST)
+        
+        async def download_image(idx: int, url: str, uri: str):
+            async with semaphore:
+                file_path = await self.download_media_file(url, uri, aweme_id, idx, file_type="image")
+                if file_path:
+                    logger.info(f"[DouYinCrawler] 图片已保存: {file_path}")
+        
+        tasks = []
         for idx, img in enumerate(images):
             url = img.get("url_list", [""])[0]
-            if not url:
-                continue
-            
-            content = await self.dy_client.get_aweme_media(url)
-            await asyncio.sleep(random.random())
-            
-            if content:
-                await douyin_store.save_video_file(
-                    aweme_id=f"{aweme_id}_{idx}",
-                    content=content,
-                    file_type="image"
-                )
+            if url:
+                tasks.append(download_image(idx, url, img.get("uri", "")))
+        await asyncio.gather(*tasks)
     
     async def get_aweme_video(self, aweme_item: Dict):
         """下载视频"""
@@ -307,15 +794,67 @@ class DouYinCrawler:
         if not url:
             return
         
-        content = await self.dy_client.get_aweme_media(url)
-        await asyncio.sleep(random.random())
+        file_path = await self.download_media_file(url, play_addr.get("uri", ""), aweme_id, 0, file_type="video")
+        if file_path:
+            await douyin_store.update_video_path(aweme_id, file_path)
+    
+    async def download_media_file(self, url: str, uri: str, aweme_id: str, idx: int,
+                                  file_type: str = "video") -> Optional[str]:
+        """
+        下载媒体到内容寻址目录，uri 已下载过时不再请求
+        
+        Args:
+            url: 媒体下载地址
+            uri: 媒体资源标识（play_addr.uri / images[].uri），缺失时使用URL路径
+            aweme_id: 视频ID
+            idx: 媒体序号（视频为 0，图片为图片序号）
+            file_type: 文件类型 (video/image)
         
-        if content:
-            await douyin_store.save_video_file(
-                aweme_id=aweme_id,
-                content=content,
-                file_type="video"
-            )
+        Returns:
+            str: 本地文件路径，下载失败返回 None
+        """
+        uri = uri or urllib.parse.urlparse(url).path
+        # 同一媒体被多个作品引用时只下载一次
+        async with self._media_lock(uri):
+            blob = douyin_store.get_media_by_uri(uri)
+            if blob:
+                logger.info(f"[DouYinCrawler] 媒体已存在，跳过下载: {uri}")
+            else:
+                temp_path = douyin_store.get_media_temp_path(uri, file_type)
+                async with self.media_downloader.download_slot(url):
+                    downloaded = await self.dy_client.download_media(url, temp_path)
+                if not downloaded:
+                    return None
+                blob = await douyin_store.save_media_blob(temp_path, uri, file_type)
+        
+        sha256, file_path = blob
+        await douyin_store.save_media_file(aweme_id, idx, sha256)
+        return file_path
+    
+    @asynccontextmanager
+    async def _media_lock(self, uri: str):
+        """占用 uri 对应的下载锁，最后一个使用者释放时删除该锁"""
+        entry = self._media_locks.setdefault(uri, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._media_locks[uri]
+    
+    def get_metrics(self) -> Dict:
+        """爬虫运行指标"""
+        if not self.dy_client:
+            return {}
+        return {
+            "concurrency": self.dy_client.concurrency.metrics(),
+            "retry": self.dy_client.retrier.metrics(),
+            "keywords": self.keyword_progress,
+            "creators": self.creator_progress,
+            "dedup": {"policy": config.DEDUP_POLICY, "seen": len(seen_awemes), **self.dedup_counts},
+        }
     
     async def create_douyin_client(self) -> DouYinClient:
         """创建抖音客户端"""
@@ -360,7 +899,18 @@ class DouYinCrawler:
             return browser_context
     
     async def close(self):
-        """关闭浏览器"""
+        """等待下载完成，提交缓冲数据，关闭连接池和浏览器"""
+        await self.media_downloader.close()
+        await douyin_store.flush()
+        
+        if self.dy_client:
+            await self.dy_client.close()
+            logger.info("[DouYinCrawler] HTTP连接池已关闭")
+        
         if self.browser_context:
-            await self.browser_context.close()
-            logger.info("[DouYinCrawler] 浏览器已关闭")
+            try:
+                await self.browser_context.close()
+                logger.info("[DouYinCrawler] 浏览器已关闭")
+            except Exception as e:
+                # start() 退出 async_playwright 上下文后浏览器可能已随之关闭
+                logger.warning(f"[DouYinCrawler] 关闭浏览器失败: {e}")
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+视频详情获取协程池
+"""
+from typing import Any, Awaitable, Callable
+
+import config
+from crawler.worker_pool import WorkerPool
+
+
+class DetailWorkerPool(WorkerPool):
+    """
+    详情协程池：固定数量的协程从有界队列中取任务获取并保存详情
+
+    实际请求并发仍由客户端的自适应控制器限制。
+    """
+
+    worker_label = "详情协程"
+
+    def __init__(
+        self,
+        handler: Callable[[Any], Awaitable],
+        worker_num: int = None,
+        queue_size: int = None
+    ):
+        """
+        Args:
+            handler: 处理单个任务（获取详情并保存）的协程函数
+            worker_num: 协程数
+            queue_size: 队列上限，队列满时 submit 等待
+        """
+        super().__init__(
+            handler,
+            worker_num=worker_num or config.DETAIL_WORKER_NUM,
+            queue_size=queue_size or config.DETAIL_QUEUE_SIZE
+        )
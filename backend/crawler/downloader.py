@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+媒体下载流水线
+"""
+import asyncio
+import urllib.parse
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict
+
+import config
+from crawler.worker_pool import WorkerPool
+
+
+class MediaDownloader(WorkerPool):
+    """媒体下载器：爬取流程把作品放入有界队列，由独立的下载协程池消费"""
+
+    worker_label = "下载协程"
+
+    def __init__(
+        self,
+        handler: Callable[[Dict], Awaitable],
+        worker_num: int = None,
+        queue_size: int = None,
+        per_host_limit: int = None,
+        global_limit: int = None
+    ):
+        """
+        Args:
+            handler: 下载单个作品媒体的协程函数
+            worker_num: 下载协程数
+            queue_size: 队列上限，队列满时 submit 等待
+            per_host_limit: 单个主机的最大并发下载数
+            global_limit: 所有主机合计的最大并发下载数
+        """
+        super().__init__(
+            handler,
+            worker_num=worker_num or config.MEDIA_DOWNLOAD_WORKERS,
+            queue_size=queue_size or config.MEDIA_QUEUE_SIZE
+        )
+        self.per_host_limit = per_host_limit or config.MEDIA_PER_HOST_CONCURRENCY
+        self.global_limit = global_limit or config.MEDIA_MAX_CONCURRENT_DOWNLOADS
+        self._global_semaphore = asyncio.Semaphore(self.global_limit)
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(self.per_host_limit)
+        )
+
+    def describe(self, aweme_item: Dict) -> str:
+        return aweme_item.get("aweme_id", "")
+
+    @asynccontextmanager
+    async def download_slot(self, url: str):
+        """占用一个下载名额：同时受全局和单主机并发上限约束"""
+        host = urllib.parse.urlparse(url).netloc
+        # 先占主机名额，避免等待繁忙主机时占住全局名额
+        async with self._host_semaphores[host]:
+            async with self._global_semaphore:
+                yield
@@ -6,8 +6,11 @@ from httpx import RequestError
 
 
 class DataFetchError(RequestError):
-    """数据获取错误"""
-    pass
+    """数据获取错误，status_code 为触发错误的 HTTP 状态码（如有）"""
+    
+    def __init__(self, message: str = "", status_code: int = None):
+        super().__init__(message)
+        self.status_code = status_code
 
 
 class IPBlockError(RequestError):
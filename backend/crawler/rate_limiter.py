@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+令牌桶限速器
+"""
+import asyncio
+import time
+from typing import Dict, Iterable
+
+import config
+
+
+class TokenBucket:
+    """令牌桶：以 rate 个/秒的速度补充令牌，最多积累 burst 个"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        # 持锁等待，保证按请求顺序发放令牌
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def set_scale(self, scale: float):
+        """按倍率调整速率（相对配置的基准速率）"""
+        self._refill()
+        self.rate = self.base_rate * scale
+
+    async def acquire(self, tokens: int = 1):
+        """获取令牌，不足时等待"""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            self._refill()
+            while self._tokens < tokens:
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= tokens
+
+
+class RateLimiter:
+    """按接口类别划分的限速器，每个类别一个令牌桶"""
+
+    def __init__(self, limits: Dict[str, Dict] = None):
+        """
+        Args:
+            limits: {类别: {"rate": 每秒请求数, "burst": 突发上限}}，默认读取 config.RATE_LIMITS
+        """
+        limits = limits if limits is not None else config.RATE_LIMITS
+        self._buckets: Dict[str, TokenBucket] = {
+            name: TokenBucket(rate=item["rate"], burst=item.get("burst", 1))
+            for name, item in limits.items()
+        }
+
+    async def acquire(self, endpoint: str):
+        """获取指定类别的令牌，未配置的类别不限速"""
+        bucket = self._buckets.get(endpoint)
+        if bucket:
+            await bucket.acquire()
+
+    def set_scale(self, scale: float, exclude: Iterable[str] = ()):
+        """按倍率调整所有类别的速率，exclude 中的类别保持不变"""
+        for name, bucket in self._buckets.items():
+            if name not in exclude:
+                bucket.set_scale(scale)
+
+    def rates(self) -> Dict[str, float]:
+        """各类别当前的速率（每秒请求数）"""
+        return {name: round(bucket.rate, 3) for name, bucket in self._buckets.items()}
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+请求重试策略
+"""
+import asyncio
+import random
+from collections import Counter
+from typing import Awaitable, Callable, Dict, Iterable, Tuple, Type
+
+import httpx
+
+import config
+from crawler.exception import DataFetchError
+from utils import logger
+
+
+# 默认重试的异常：超时和网络层错误
+RETRY_EXCEPTIONS: Tuple[Type[BaseException], ...] = (httpx.TimeoutException, httpx.TransportError)
+
+
+class RetryPolicy:
+    """单个接口类别的重试策略：指数退避 + 全抖动"""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff_base: float = None,
+        backoff_max: float = None,
+        retry_statuses: Iterable[int] = None,
+        retry_exceptions: Tuple[Type[BaseException], ...] = RETRY_EXCEPTIONS
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = config.RETRY_BACKOFF_BASE_SEC if backoff_base is None else backoff_base
+        self.backoff_max = config.RETRY_BACKOFF_MAX_SEC if backoff_max is None else backoff_max
+        self.retry_statuses = set(config.RETRY_ON_STATUS if retry_statuses is None else retry_statuses)
+        self.retry_exceptions = retry_exceptions
+
+    def should_retry(self, exc: BaseException) -> bool:
+        """判断异常是否可重试"""
+        if isinstance(exc, DataFetchError):
+            return exc.status_code in self.retry_statuses
+        return isinstance(exc, self.retry_exceptions)
+
+    def backoff(self, attempt: int) -> float:
+        """第 attempt 次失败后的等待时间（秒）"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+
+class Retrier:
+    """按接口类别执行重试，统计重试/放弃次数，总重试次数受单次运行预算限制"""
+
+    def __init__(self, policies: Dict[str, Dict] = None, budget: int = None):
+        """
+        Args:
+            policies: {类别: RetryPolicy 参数}，"default" 用于未配置的类别，默认读取 config.RETRY_POLICIES
+            budget: 单次运行允许的重试总次数
+        """
+        policies = policies if policies is not None else config.RETRY_POLICIES
+        self._policies: Dict[str, RetryPolicy] = {
+            name: RetryPolicy(**item) for name, item in policies.items()
+        }
+        self._default_policy = self._policies.get("default") or RetryPolicy()
+        self.budget = config.RETRY_BUDGET if budget is None else budget
+        self.budget_remaining = self.budget
+        self.retries: Counter = Counter()
+        self.give_ups: Counter = Counter()
+
+    def policy(self, endpoint: str) -> RetryPolicy:
+        return self._policies.get(endpoint, self._default_policy)
+
+    async def call(self, endpoint: str, fn: Callable[[], Awaitable]):
+        """
+        执行 fn，可重试的异常按策略退避后重试
+
+        Args:
+            endpoint: 接口类别
+            fn: 每次尝试调用的协程函数
+        """
+        policy = self.policy(endpoint)
+        attempt = 1
+        while True:
+            try:
+                return await fn()
+            except Exception as exc:
+                if not policy.should_retry(exc):
+                    raise
+                if attempt >= policy.max_attempts or self.budget_remaining <= 0:
+                    self.give_ups[endpoint] += 1
+                    logger.error(f"[Retrier] {endpoint or 'default'} 第 {attempt} 次尝试失败，放弃重试: {exc}")
+                    raise
+                self.budget_remaining -= 1
+                self.retries[endpoint] += 1
+                delay = policy.backoff(attempt)
+                logger.warning(
+                    f"[Retrier] {endpoint or 'default'} 第 {attempt} 次尝试失败，"
+                    f"{delay:.1f} 秒后重试: {exc}"
+                )
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    def metrics(self) -> Dict:
+        """重试计数指标"""
+        return {
+            "retries": dict(self.retries),
+            "give_ups": dict(self.give_ups),
+            "budget_remaining": self.budget_remaining,
+        }
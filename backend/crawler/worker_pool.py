@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+有界队列协程池
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional
+
+from utils import logger
+
+
+class WorkerPool:
+    """
+    协程池：固定数量的协程从有界队列中取任务交给 handler 处理
+
+    提交方在队列满时等待，同时处理中的任务数不超过 协程数 + 队列上限，
+    内存占用与任务总数无关。单个任务失败只记录日志，不影响其他任务。
+    """
+
+    # 日志中的协程名称，子类覆盖
+    worker_label = "协程"
+
+    def __init__(self, handler: Callable[[Any], Awaitable], worker_num: int, queue_size: int):
+        """
+        Args:
+            handler: 处理单个任务的协程函数
+            worker_num: 协程数
+            queue_size: 队列上限，队列满时 submit 等待
+        """
+        self.handler = handler
+        self.worker_num = worker_num
+        self.queue_size = queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self.processed = 0
+        self.failed = 0
+
+    def start(self):
+        """启动协程"""
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker(idx))
+            for idx in range(self.worker_num)
+        ]
+        logger.info(f"[{type(self).__name__}] 启动 {self.worker_num} 个{self.worker_label}")
+
+    async def submit(self, item: Any):
+        """提交任务，队列已满时等待"""
+        if not self._workers:
+            self.start()
+        await self._queue.put(item)
+
+    def describe(self, item: Any) -> str:
+        """任务在日志中的描述"""
+        return str(item)
+
+    async def _worker(self, idx: int):
+        """协程：循环消费队列"""
+        while True:
+            item = await self._queue.get()
+            try:
+                await self.handler(item)
+                self.processed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"[{type(self).__name__}] {self.worker_label}{idx} 处理失败: {self.describe(item)}, {e}")
+            finally:
+                self._queue.task_done()
+
+    async def close(self):
+        """等待队列中的任务全部完成后停止协程"""
+        if not self._workers:
+            return
+        logger.info(f"[{type(self).__name__}] 等待剩余 {self._queue.qsize()} 个任务完成...")
+        await self._queue.join()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        logger.info(f"[{type(self).__name__}] 队列已清空")
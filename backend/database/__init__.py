@@ -3,6 +3,11 @@
 数据库模块入口
 """
 from .models import db, Database
+from .writer import db_writer, DatabaseWriter
 from .store import douyin_store, DouyinStore
+from .seen import seen_awemes, SeenAwemeSet
 
-__all__ = ['db', 'Database', 'douyin_store', 'DouyinStore']
+__all__ = [
+    'db', 'Database', 'db_writer', 'DatabaseWriter', 'douyin_store', 'DouyinStore',
+    'seen_awemes', 'SeenAwemeSet',
+]
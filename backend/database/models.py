@@ -2,7 +2,9 @@
 """
 SQLite 数据库模型定义
 """
+import os
 import sqlite3
+import urllib.request
 from datetime import datetime
 from typing import Optional
 import config
@@ -14,18 +16,18 @@ class Database:
     def __init__(self, db_path: str = None):
         self.db_path = db_path or config.DATABASE_PATH
         self.conn: Optional[sqlite3.Connection] = None
+        # 只读连接，供 API 查询使用，不与写入争锁
+        self._read_conn: Optional[sqlite3.Connection] = None
         self.init_db()
     
     def init_db(self):
         """初始化数据库，创建表"""
         # 确保数据库目录存在
-        import os
         db_dir = os.path.dirname(self.db_path)
         if db_dir and not os.path.exists(db_dir):
             os.makedirs(db_dir, exist_ok=True)
         
-        self.conn = sqlite3.connect(self.db_path)
-        self.conn.row_factory = sqlite3.Row
+        self.conn = self.connect()
         cursor = self.conn.cursor()
         
         # 创建视频表
@@ -65,6 +67,63 @@ class Database:
             )
         ''')
         
+        # 创建创作者增量爬取状态表（记录已爬取的最新作品位置）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS creator_crawl_state (
+                sec_user_id TEXT PRIMARY KEY,
+                newest_create_time INTEGER DEFAULT 0,
+                update_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # 创建短链接缓存表（短链接 -> 视频ID）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS short_urls (
+                short_url TEXT PRIMARY KEY,
+                aweme_id TEXT NOT NULL,
+                resolve_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # 创建爬取断点表（中断后 --resume 从断点继续）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS crawl_checkpoints (
+                task_type TEXT NOT NULL,
+                task_key TEXT NOT NULL,
+                state TEXT,
+                update_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (task_type, task_key)
+            )
+        ''')
+        
+        # 创建媒体文件表（内容寻址：文件按 sha256 命名，相同内容只保存一份）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS media_blobs (
+                sha256 TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                size INTEGER DEFAULT 0,
+                create_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # 媒体 uri（CDN 资源标识）到文件的映射，下载前据此判断是否已有
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS media_uris (
+                uri TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL
+            )
+        ''')
+        
+        # 作品媒体到文件的映射（视频 idx 为 0，图片为图片序号）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS media_files (
+                aweme_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                PRIMARY KEY (aweme_id, idx)
+            )
+        ''')
+        
         # 创建索引
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_aweme_id ON videos(aweme_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_author_id ON videos(author_id)')
@@ -73,8 +132,34 @@ class Database:
         self.conn.commit()
         print(f"[Database] Database initialized: {self.db_path}")
     
+    def connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """创建新的数据库连接，并应用 SQLITE_PRAGMAS 调优参数"""
+        if read_only:
+            uri = f"file:{urllib.request.pathname2url(os.path.abspath(self.db_path))}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        
+        for name, value in config.SQLITE_PRAGMAS.items():
+            # journal_mode 是数据库文件级设置，只读连接无法修改
+            if read_only and name == "journal_mode":
+                continue
+            conn.execute(f"PRAGMA {name}={value}")
+        return conn
+    
+    @property
+    def read_conn(self) -> sqlite3.Connection:
+        """只读连接（首次使用时创建）"""
+        if self._read_conn is None:
+            self._read_conn = self.connect(read_only=True)
+        return self._read_conn
+    
     def close(self):
         """关闭数据库连接"""
+        if self._read_conn:
+            self._read_conn.close()
+            self._read_conn = None
         if self.conn:
             self.conn.close()
             print("[Database] Database connection closed")
@@ -90,8 +175,8 @@ class Database:
         return cursor
     
     def fetchone(self, sql: str, params: tuple = None):
-        """查询单条记录"""
-        cursor = self.conn.cursor()
+        """查询单条记录（只读连接）"""
+        cursor = self.read_conn.cursor()
         if params:
             cursor.execute(sql, params)
         else:
@@ -99,8 +184,8 @@ class Database:
         return cursor.fetchone()
     
     def fetchall(self, sql: str, params: tuple = None):
-        """查询多条记录"""
-        cursor = self.conn.cursor()
+        """查询多条记录（只读连接）"""
+        cursor = self.read_conn.cursor()
         if params:
             cursor.execute(sql, params)
         else:
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+已爬取作品集合（跨运行去重）
+"""
+import time
+from array import array
+from bisect import bisect_left
+from typing import Optional, Set
+
+from .models import Database, db
+
+
+class SeenAwemeSet:
+    """
+    已保存作品ID集合
+
+    启动时从 videos 表加载，aweme_id 以有序 int64 数组存放（每个约 16 字节，含最后爬取时间），
+    用二分查找判断；本次运行新保存的作品放在一个小集合中。
+    """
+
+    def __init__(self, database: Database):
+        self.database = database
+        self._ids = array("q")
+        # 与 _ids 一一对应的最后爬取时间（秒级时间戳）
+        self._crawl_times = array("q")
+        self._added: Set[int] = set()
+        self.loaded = False
+
+    def load(self):
+        """从数据库加载已保存的作品ID，可在线程中执行"""
+        started = time.perf_counter()
+        conn = self.database.connect(read_only=True)
+        try:
+            rows = conn.execute(
+                "SELECT aweme_id, CAST(strftime('%s', crawl_time) AS INTEGER) FROM videos"
+            ).fetchall()
+        finally:
+            conn.close()
+
+        pairs = []
+        for aweme_id, crawl_time in rows:
+            key = self._to_int(aweme_id)
+            if key is not None:
+                pairs.append((key, crawl_time or 0))
+        pairs.sort()
+
+        self._ids = array("q", (key for key, _ in pairs))
+        self._crawl_times = array("q", (crawl_time for _, crawl_time in pairs))
+        self._added.clear()
+        self.loaded = True
+        print(f"[SeenAwemeSet] Loaded {len(self._ids)} aweme ids in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    @staticmethod
+    def _to_int(aweme_id) -> Optional[int]:
+        try:
+            return int(aweme_id)
+        except (TypeError, ValueError):
+            return None
+
+    def _index(self, key: int) -> int:
+        idx = bisect_left(self._ids, key)
+        return idx if idx < len(self._ids) and self._ids[idx] == key else -1
+
+    def contains(self, aweme_id: str) -> bool:
+        """作品是否已保存过"""
+        key = self._to_int(aweme_id)
+        if key is None:
+            return False
+        return key in self._added or self._index(key) >= 0
+
+    def age(self, aweme_id: str) -> Optional[float]:
+        """
+        距离上次爬取的秒数
+
+        Returns:
+            float: 秒数；本次运行已保存的返回 0，未保存过返回 None
+        """
+        key = self._to_int(aweme_id)
+        if key is None:
+            return None
+        if key in self._added:
+            return 0
+        idx = self._index(key)
+        if idx < 0:
+            return None
+        return max(0, time.time() - self._crawl_times[idx])
+
+    def add(self, aweme_id: str):
+        """记录本次运行保存的作品"""
+        key = self._to_int(aweme_id)
+        if key is not None:
+            self._added.add(key)
+
+    def __len__(self) -> int:
+        return len(self._ids) + sum(1 for key in self._added if self._index(key) < 0)
+
+
+# 全局已爬取作品集合
+seen_awemes = SeenAwemeSet(db)
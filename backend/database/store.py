@@ -3,20 +3,70 @@
 数据存储逻辑
 """
 import os
+import json
 import asyncio
+import hashlib
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 from .models import db
+from .writer import db_writer
 import config
 
 
+# 视频 UPSERT：一条语句完成插入或更新
+_VIDEO_UPSERT_SQL = '''
+    INSERT INTO videos (
+        aweme_id, title, desc, author_name, author_id,
+        video_url, cover_url, like_count, comment_count,
+        share_count, create_time, keyword
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(aweme_id) DO UPDATE SET
+        title=excluded.title, desc=excluded.desc,
+        author_name=excluded.author_name, author_id=excluded.author_id,
+        video_url=excluded.video_url, cover_url=excluded.cover_url,
+        like_count=excluded.like_count, comment_count=excluded.comment_count,
+        share_count=excluded.share_count, create_time=excluded.create_time,
+        keyword=excluded.keyword, crawl_time=CURRENT_TIMESTAMP
+'''
+
+# 已保存作品只刷新互动数据
+_VIDEO_STATS_UPDATE_SQL = '''
+    UPDATE videos SET
+        like_count=?, comment_count=?, share_count=?, crawl_time=CURRENT_TIMESTAMP
+    WHERE aweme_id=?
+'''
+
+# 创作者 UPSERT
+_CREATOR_UPSERT_SQL = '''
+    INSERT INTO creators (
+        sec_user_id, nickname, signature, avatar_url,
+        follower_count, following_count, aweme_count, total_favorited
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(sec_user_id) DO UPDATE SET
+        nickname=excluded.nickname, signature=excluded.signature,
+        avatar_url=excluded.avatar_url, follower_count=excluded.follower_count,
+        following_count=excluded.following_count, aweme_count=excluded.aweme_count,
+        total_favorited=excluded.total_favorited
+'''
+
+
 class DouyinStore:
     """抖音数据存储类"""
     
-    @staticmethod
-    async def save_video(aweme_item: Dict, keyword: str = "") -> bool:
+    def __init__(self, batch_size: int = None, flush_interval: float = None):
+        self.batch_size = batch_size or config.DB_BATCH_SIZE
+        self.flush_interval = flush_interval or config.DB_FLUSH_INTERVAL_SEC
+        # 待写入的视频行，按条数或时间批量提交
+        self._video_buffer: List[tuple] = []
+        self._stats_buffer: List[tuple] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        # 最近一次提交给写入线程的操作
+        self._last_write: Optional[asyncio.Future] = None
+    
+    async def save_video(self, aweme_item: Dict, keyword: str = "") -> bool:
         """
-        保存视频数据
+        保存视频数据（写入缓冲区，批量提交）
         
         Args:
             aweme_item: 抖音视频信息字典
@@ -30,69 +80,118 @@ class DouyinStore:
             if not aweme_id:
                 return False
             
-            # 检查是否已存在
-            existing = db.fetchone("SELECT id FROM videos WHERE aweme_id = ?", (aweme_id,))
-            
             # 提取视频信息
             author_info = aweme_item.get("author", {})
             statistics = aweme_item.get("statistics", {})
+            desc = aweme_item.get("desc", "")
             
-            video_data = {
-                "aweme_id": aweme_id,
-                "title": aweme_item.get("desc", "")[:200],  # 标题截取前200字符
-                "desc": aweme_item.get("desc", ""),
-                "author_name": author_info.get("nickname", ""),
-                "author_id": author_info.get("sec_uid", ""),
-                "video_url": DouyinStore._extract_video_download_url(aweme_item),
-                "cover_url": aweme_item.get("video", {}).get("cover", {}).get("url_list", [""])[0],
-                "like_count": statistics.get("digg_count", 0),
-                "comment_count": statistics.get("comment_count", 0),
-                "share_count": statistics.get("share_count", 0),
-                "create_time": aweme_item.get("create_time", 0),
-                "keyword": keyword,
-            }
+            params = (
+                aweme_id,
+                desc[:200],  # 标题截取前200字符
+                desc,
+                author_info.get("nickname", ""),
+                author_info.get("sec_uid", ""),
+                DouyinStore._extract_video_download_url(aweme_item),
+                aweme_item.get("video", {}).get("cover", {}).get("url_list", [""])[0],
+                statistics.get("digg_count", 0),
+                statistics.get("comment_count", 0),
+                statistics.get("share_count", 0),
+                aweme_item.get("create_time", 0),
+                keyword,
+            )
+            self._video_buffer.append(params)
+            print(f"[DouyinStore] Saved video: {aweme_id} - {desc[:50]}")
             
-            if existing:
-                # 更新
-                sql = '''
-                    UPDATE videos SET 
-                        title=?, desc=?, author_name=?, author_id=?,
-                        video_url=?, cover_url=?, like_count=?, comment_count=?,
-                        share_count=?, create_time=?, keyword=?
-                    WHERE aweme_id=?
-                '''
-                params = (
-                    video_data["title"], video_data["desc"], video_data["author_name"],
-                    video_data["author_id"], video_data["video_url"], video_data["cover_url"],
-                    video_data["like_count"], video_data["comment_count"], video_data["share_count"],
-                    video_data["create_time"], video_data["keyword"], aweme_id
-                )
-            else:
-                # 插入
-                sql = '''
-                    INSERT INTO videos (
-                        aweme_id, title, desc, author_name, author_id,
-                        video_url, cover_url, like_count, comment_count,
-                        share_count, create_time, keyword
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                '''
-                params = (
-                    video_data["aweme_id"], video_data["title"], video_data["desc"],
-                    video_data["author_name"], video_data["author_id"], video_data["video_url"],
-                    video_data["cover_url"], video_data["like_count"], video_data["comment_count"],
-                    video_data["share_count"], video_data["create_time"], video_data["keyword"]
-                )
-            
-            db.execute(sql, params)
-            print(f"[DouyinStore] Saved video: {aweme_id} - {video_data['title'][:50]}")
+            await self._buffer_added()
             return True
             
         except Exception as e:
             print(f"[DouyinStore] Error saving video: {e}")
             return False
     
-    @staticmethod
-    async def save_creator(sec_user_id: str, creator_info: Dict) -> bool:
+    async def refresh_video_stats(self, aweme_item: Dict) -> bool:
+        """
+        只刷新已保存视频的点赞/评论/分享数（写入缓冲区，批量提交）
+        
+        Args:
+            aweme_item: 抖音视频信息字典
+        
+        Returns:
+            bool: 是否保存成功
+        """
+        try:
+            aweme_id = aweme_item.get("aweme_id", "")
+            statistics = aweme_item.get("statistics")
+            if not aweme_id or not statistics:
+                return False
+            
+            self._stats_buffer.append((
+                statistics.get("digg_count", 0),
+                statistics.get("comment_count", 0),
+                statistics.get("share_count", 0),
+                aweme_id,
+            ))
+            await self._buffer_added()
+            return True
+            
+        except Exception as e:
+            print(f"[DouyinStore] Error refreshing video stats: {e}")
+            return False
+    
+    async def _buffer_added(self):
+        """缓冲区达到批量大小时提交，否则确保刷新定时器已启动"""
+        if len(self._video_buffer) + len(self._stats_buffer) >= self.batch_size:
+            await self._submit_buffer()
+        elif self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self.flush_interval, self._schedule_flush)
+    
+    def _schedule_flush(self):
+        """定时器回调：到达刷新间隔后提交缓冲区"""
+        self._flush_handle = None
+        self._flush_task = asyncio.ensure_future(self._submit_buffer())
+    
+    async def _submit_buffer(self) -> Optional[asyncio.Future]:
+        """将缓冲区作为一个事务提交给写入线程，不等待写入完成"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        if not self._video_buffer and not self._stats_buffer:
+            return None
+        
+        rows, self._video_buffer = self._video_buffer, []
+        stats_rows, self._stats_buffer = self._stats_buffer, []
+        
+        def write(conn):
+            if rows:
+                conn.executemany(_VIDEO_UPSERT_SQL, rows)
+            if stats_rows:
+                conn.executemany(_VIDEO_STATS_UPDATE_SQL, stats_rows)
+        
+        future = await db_writer.submit(write)
+        self._last_write = future
+        return future
+    
+    async def flush(self) -> bool:
+        """
+        提交缓冲区并等待所有已提交的写操作完成
+        
+        Returns:
+            bool: 是否全部写入成功
+        """
+        await self._submit_buffer()
+        # 写入线程按顺序执行，等待最后一个操作即可
+        if self._last_write is None:
+            return True
+        try:
+            await self._last_write
+            return True
+        except Exception as e:
+            print(f"[DouyinStore] Error flushing videos: {e}")
+            return False
+    
+    async def save_creator(self, sec_user_id: str, creator_info: Dict) -> bool:
         """
         保存创作者信息
         
@@ -107,54 +206,24 @@ class DouyinStore:
             if not sec_user_id:
                 return False
             
-            # 检查是否已存在
-            existing = db.fetchone("SELECT id FROM creators WHERE sec_user_id = ?", (sec_user_id,))
-            
             user = creator_info.get("user", {})
+            nickname = user.get("nickname", "")
             
-            creator_data = {
-                "sec_user_id": sec_user_id,
-                "nickname": user.get("nickname", ""),
-                "signature": user.get("signature", ""),
-                "avatar_url": user.get("avatar_larger", {}).get("url_list", [""])[0],
-                "follower_count": user.get("follower_count", 0),
-                "following_count": user.get("following_count", 0),
-                "aweme_count": user.get("aweme_count", 0),
-                "total_favorited": user.get("total_favorited", 0),
-            }
-            
-            if existing:
-                # 更新
-                sql = '''
-                    UPDATE creators SET
-                        nickname=?, signature=?, avatar_url=?,
-                        follower_count=?, following_count=?,
-                        aweme_count=?, total_favorited=?
-                    WHERE sec_user_id=?
-                '''
-                params = (
-                    creator_data["nickname"], creator_data["signature"],
-                    creator_data["avatar_url"], creator_data["follower_count"],
-                    creator_data["following_count"], creator_data["aweme_count"],
-                    creator_data["total_favorited"], sec_user_id
-                )
-            else:
-                # 插入
-                sql = '''
-                    INSERT INTO creators (
-                        sec_user_id, nickname, signature, avatar_url,
-                        follower_count, following_count, aweme_count, total_favorited
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                '''
-                params = (
-                    creator_data["sec_user_id"], creator_data["nickname"],
-                    creator_data["signature"], creator_data["avatar_url"],
-                    creator_data["follower_count"], creator_data["following_count"],
-                    creator_data["aweme_count"], creator_data["total_favorited"]
-                )
+            params = (
+                sec_user_id,
+                nickname,
+                user.get("signature", ""),
+                user.get("avatar_larger", {}).get("url_list", [""])[0],
+                user.get("follower_count", 0),
+                user.get("following_count", 0),
+                user.get("aweme_count", 0),
+                user.get("total_favorited", 0),
+            )
             
-            db.execute(sql, params)
-            print(f"[DouyinStore] Saved creator: {sec_user_id} - {creator_data['nickname']}")
+            # 等待写入完成，确保返回值反映写入结果
+            future = await db_writer.execute(_CREATOR_UPSERT_SQL, params)
+            await future
+            print(f"[DouyinStore] Saved creator: {sec_user_id} - {nickname}")
             return True
             
         except Exception as e:
@@ -162,37 +231,336 @@ class DouyinStore:
             return False
     
     @staticmethod
-    async def save_video_file(aweme_id: str, content: bytes, file_type: str = "video") -> str:
+    def get_creator_newest_create_time(sec_user_id: str) -> int:
         """
-        保存视频/图片文件到本地
+        获取创作者已爬取的最新作品发布时间（增量爬取的停止位置）
         
         Args:
-            aweme_id: 视频ID
-            content: 文件二进制内容
+            sec_user_id: 创作者ID
+        
+        Returns:
+            int: 发布时间戳，未爬取过返回 0
+        """
+        try:
+            row = db.fetchone(
+                "SELECT newest_create_time FROM creator_crawl_state WHERE sec_user_id = ?",
+                (sec_user_id,)
+            )
+            return row[0] if row and row[0] else 0
+        except Exception as e:
+            print(f"[DouyinStore] Error loading creator crawl state: {e}")
+            return 0
+    
+    async def save_creator_crawl_state(self, sec_user_id: str, newest_create_time: int) -> bool:
+        """
+        保存创作者增量爬取状态
+        
+        Args:
+            sec_user_id: 创作者ID
+            newest_create_time: 已爬取的最新作品发布时间
+        
+        Returns:
+            bool: 是否保存成功
+        """
+        try:
+            sql = '''
+                INSERT INTO creator_crawl_state (sec_user_id, newest_create_time, update_time)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(sec_user_id) DO UPDATE SET
+                    newest_create_time=MAX(newest_create_time, excluded.newest_create_time),
+                    update_time=excluded.update_time
+            '''
+            self._last_write = await db_writer.execute(sql, (sec_user_id, newest_create_time))
+            return True
+        except Exception as e:
+            print(f"[DouyinStore] Error saving creator crawl state: {e}")
+            return False
+    
+    @staticmethod
+    def get_short_url_aweme_ids(short_urls: List[str]) -> Dict[str, str]:
+        """
+        批量查询已缓存的短链接解析结果
+        
+        Args:
+            short_urls: 短链接列表
+        
+        Returns:
+            Dict: {短链接: 视频ID}，未缓存的不包含在结果中
+        """
+        result = {}
+        try:
+            # 分批查询，避免超过 SQLite 参数个数上限
+            for i in range(0, len(short_urls), 500):
+                chunk = short_urls[i:i + 500]
+                rows = db.fetchall(
+                    f"SELECT short_url, aweme_id FROM short_urls WHERE short_url IN ({','.join('?' * len(chunk))})",
+                    tuple(chunk)
+                )
+                result.update({row[0]: row[1] for row in rows})
+        except Exception as e:
+            print(f"[DouyinStore] Error loading short urls: {e}")
+        return result
+    
+    async def save_short_urls(self, mapping: Dict[str, str]) -> bool:
+        """
+        保存短链接解析结果
+        
+        Args:
+            mapping: {短链接: 视频ID}
+        
+        Returns:
+            bool: 是否保存成功
+        """
+        if not mapping:
+            return True
+        try:
+            sql = '''
+                INSERT INTO short_urls (short_url, aweme_id, resolve_time)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(short_url) DO UPDATE SET
+                    aweme_id=excluded.aweme_id, resolve_time=excluded.resolve_time
+            '''
+            self._last_write = await db_writer.executemany(sql, list(mapping.items()))
+            return True
+        except Exception as e:
+            print(f"[DouyinStore] Error saving short urls: {e}")
+            return False
+    
+    @staticmethod
+    def get_checkpoint(task_type: str, task_key: str) -> Optional[Dict]:
+        """
+        获取爬取断点
+        
+        Args:
+            task_type: 爬取类型（search | detail | creator）
+            task_key: 任务标识（关键词、创作者ID等）
+        
+        Returns:
+            Dict: 断点状态，不存在返回 None
+        """
+        try:
+            row = db.fetchone(
+                "SELECT state FROM crawl_checkpoints WHERE task_type = ? AND task_key = ?",
+                (task_type, task_key)
+            )
+            return json.loads(row[0]) if row and row[0] else None
+        except Exception as e:
+            print(f"[DouyinStore] Error loading checkpoint: {e}")
+            return None
+    
+    @staticmethod
+    def get_checkpoints(task_type: str) -> Dict[str, Dict]:
+        """
+        获取某个爬取类型的全部断点
+        
+        Args:
+            task_type: 爬取类型
+        
+        Returns:
+            Dict: {任务标识: 断点状态}
+        """
+        try:
+            rows = db.fetchall(
+                "SELECT task_key, state FROM crawl_checkpoints WHERE task_type = ?", (task_type,)
+            )
+            return {row[0]: json.loads(row[1]) for row in rows if row[1]}
+        except Exception as e:
+            print(f"[DouyinStore] Error loading checkpoints: {e}")
+            return {}
+    
+    async def save_checkpoint(self, task_type: str, task_key: str, state: Dict) -> bool:
+        """
+        保存爬取断点
+        
+        先提交缓冲区中的视频，写入线程按顺序执行，保证断点不会早于它覆盖的数据落盘
+        
+        Args:
+            task_type: 爬取类型
+            task_key: 任务标识
+            state: 断点状态
+        
+        Returns:
+            bool: 是否保存成功
+        """
+        try:
+            await self._submit_buffer()
+            sql = '''
+                INSERT INTO crawl_checkpoints (task_type, task_key, state, update_time)
+                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(task_type, task_key) DO UPDATE SET
+                    state=excluded.state, update_time=excluded.update_time
+            '''
+            self._last_write = await db_writer.execute(
+                sql, (task_type, task_key, json.dumps(state, ensure_ascii=False))
+            )
+            return True
+        except Exception as e:
+            print(f"[DouyinStore] Error saving checkpoint: {e}")
+            return False
+    
+    async def clear_checkpoints(self, task_type: str) -> bool:
+        """
+        清除某个爬取类型的全部断点
+        
+        Args:
+            task_type: 爬取类型
+        
+        Returns:
+            bool: 是否清除成功
+        """
+        try:
+            self._last_write = await db_writer.execute(
+                "DELETE FROM crawl_checkpoints WHERE task_type = ?", (task_type,)
+            )
+            return True
+        except Exception as e:
+            print(f"[DouyinStore] Error clearing checkpoints: {e}")
+            return False
+    
+    @staticmethod
+    def get_media_file_path(name: str, file_type: str = "video") -> str:
+        """
+        获取视频/图片的本地保存路径
+        
+        Args:
+            name: 文件名（不含扩展名，可包含子目录）
             file_type: 文件类型 (video/image)
         
         Returns:
-            str: 保存的文件路径
+            str: 保存路径
+        """
+        save_dir = config.VIDEO_SAVE_DIR if file_type == "video" else config.IMAGE_SAVE_DIR
+        ext = "mp4" if file_type == "video" else "jpg"
+        return os.path.join(save_dir, f"{name}.{ext}")
+    
+    async def update_video_path(self, aweme_id: str, file_path: str) -> bool:
+        """
+        更新数据库中视频文件的本地路径
+        
+        Args:
+            aweme_id: 视频ID
+            file_path: 文件路径
+        
+        Returns:
+            bool: 是否提交成功
         """
         try:
-            save_dir = config.VIDEO_SAVE_DIR if file_type == "video" else config.IMAGE_SAVE_DIR
-            os.makedirs(save_dir, exist_ok=True)
-            
-            ext = "mp4" if file_type == "video" else "jpg"
-            file_path = os.path.join(save_dir, f"{aweme_id}.{ext}")
-            
-            with open(file_path, "wb") as f:
-                f.write(content)
-            
-            # 更新数据库中的文件路径
-            db.execute("UPDATE videos SET video_path=? WHERE aweme_id=?", (file_path, aweme_id))
-            
-            print(f"[DouyinStore] Saved {file_type}: {file_path}")
-            return file_path
+            # 先提交缓冲区，写入线程按顺序执行，保证视频行已存在
+            await self._submit_buffer()
+            self._last_write = await db_writer.execute(
+                "UPDATE videos SET video_path=? WHERE aweme_id=?", (file_path, aweme_id)
+            )
+            print(f"[DouyinStore] Saved video: {file_path}")
+            return True
             
         except Exception as e:
-            print(f"[DouyinStore] Error saving {file_type} file: {e}")
-            return ""
+            print(f"[DouyinStore] Error saving video path: {e}")
+            return False
+    
+    @staticmethod
+    def get_media_by_uri(uri: str) -> Optional[Tuple[str, str]]:
+        """
+        按媒体 uri 查找已保存的文件
+        
+        Args:
+            uri: 媒体资源标识
+        
+        Returns:
+            Tuple[str, str]: (sha256, 文件路径)，未保存或文件已被删除返回 None
+        """
+        try:
+            row = db.fetchone(
+                "SELECT b.sha256, b.path FROM media_uris u JOIN media_blobs b ON b.sha256 = u.sha256 WHERE u.uri = ?",
+                (uri,)
+            )
+            if row and os.path.exists(row[1]):
+                return row[0], row[1]
+        except Exception as e:
+            print(f"[DouyinStore] Error loading media blob: {e}")
+        return None
+    
+    @staticmethod
+    def has_media_files(aweme_id: str) -> bool:
+        """作品是否已有下载完成的媒体文件"""
+        try:
+            return db.fetchone("SELECT 1 FROM media_files WHERE aweme_id = ? LIMIT 1", (aweme_id,)) is not None
+        except Exception as e:
+            print(f"[DouyinStore] Error loading media files: {e}")
+            return False
+    
+    @staticmethod
+    def get_media_temp_path(uri: str, file_type: str = "video") -> str:
+        """下载中的临时文件路径（按 uri 命名，中断后可续传）"""
+        return DouyinStore.get_media_file_path(
+            os.path.join(".tmp", hashlib.sha1(uri.encode("utf-8")).hexdigest()), file_type
+        )
+    
+    async def save_media_blob(self, temp_path: str, uri: str, file_type: str = "video") -> Tuple[str, str]:
+        """
+        将下载完成的临时文件按内容哈希存入媒体目录，并记录 uri 映射
+        
+        内容相同的文件已存在时删除临时文件，直接复用已有文件。
+        
+        Args:
+            temp_path: 下载完成的临时文件
+            uri: 媒体资源标识
+            file_type: 文件类型 (video/image)
+        
+        Returns:
+            Tuple[str, str]: (sha256, 文件路径)
+        """
+        sha256 = await asyncio.to_thread(self._file_sha256, temp_path)
+        row = db.fetchone("SELECT path FROM media_blobs WHERE sha256 = ?", (sha256,))
+        blob_path = row[0] if row else self.get_media_file_path(os.path.join(sha256[:2], sha256), file_type)
+        if os.path.exists(blob_path):
+            os.remove(temp_path)
+        else:
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            os.replace(temp_path, blob_path)
+        size = os.path.getsize(blob_path)
+        
+        def write(conn):
+            conn.execute(
+                "INSERT OR REPLACE INTO media_blobs (sha256, path, size) VALUES (?, ?, ?)",
+                (sha256, blob_path, size)
+            )
+            conn.execute("INSERT OR REPLACE INTO media_uris (uri, sha256) VALUES (?, ?)", (uri, sha256))
+        
+        # 等待映射写入完成，之后对同一 uri 的查询即可命中
+        self._last_write = await db_writer.submit(write)
+        await self._last_write
+        return sha256, blob_path
+    
+    async def save_media_file(self, aweme_id: str, idx: int, sha256: str) -> bool:
+        """
+        记录作品媒体对应的文件
+        
+        Args:
+            aweme_id: 视频ID
+            idx: 媒体序号（视频为 0，图片为图片序号）
+            sha256: 文件内容哈希
+        
+        Returns:
+            bool: 是否提交成功
+        """
+        try:
+            self._last_write = await db_writer.execute(
+                "INSERT OR REPLACE INTO media_files (aweme_id, idx, sha256) VALUES (?, ?, ?)",
+                (aweme_id, idx, sha256)
+            )
+            return True
+        except Exception as e:
+            print(f"[DouyinStore] Error saving media file: {e}")
+            return False
+    
+    @staticmethod
+    def _file_sha256(file_path: str) -> str:
+        """分块计算文件的 sha256"""
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(config.MEDIA_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
     
     @staticmethod
     def _extract_video_download_url(aweme_item: Dict) -> str:
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+异步数据库写入线程
+"""
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from .models import Database, db
+import config
+
+
+class DatabaseWriter:
+    """数据库写入器：单个专用线程独占写连接，按提交顺序执行写操作"""
+
+    def __init__(self, database: Database, max_pending: int = None):
+        self.database = database
+        self.max_pending = max_pending or config.DB_WRITER_QUEUE_SIZE
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _init_thread(self):
+        """在写入线程中创建连接，连接只在该线程使用"""
+        self._conn = self.database.connect()
+
+    def _ensure_started(self):
+        """首次提交时启动写入线程"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix="db-writer",
+                initializer=self._init_thread
+            )
+            # 排队中的写操作上限，超过后提交方等待（背压）
+            self._slots = asyncio.Semaphore(self.max_pending)
+
+    def _run(self, fn: Callable, args: tuple):
+        """在写入线程中执行，每个操作一个事务"""
+        with self._conn:
+            return fn(self._conn, *args)
+
+    async def submit(self, fn: Callable, *args) -> asyncio.Future:
+        """
+        提交写操作，队列已满时等待
+
+        Args:
+            fn: 写操作，签名为 fn(conn, *args)
+            args: 写操作参数
+
+        Returns:
+            asyncio.Future: 完成句柄，需要确认写入结果时 await
+        """
+        self._ensure_started()
+        await self._slots.acquire()
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, self._run, fn, args)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future: asyncio.Future):
+        """释放队列名额并记录未被等待的异常"""
+        self._slots.release()
+        if not future.cancelled() and future.exception():
+            print(f"[DatabaseWriter] Write failed: {future.exception()}")
+
+    async def execute(self, sql: str, params: tuple = ()) -> asyncio.Future:
+        """提交单条SQL"""
+        return await self.submit(lambda conn: conn.execute(sql, params).rowcount)
+
+    async def executemany(self, sql: str, params_list: list) -> asyncio.Future:
+        """提交批量SQL（单个事务）"""
+        return await self.submit(lambda conn: conn.executemany(sql, params_list).rowcount)
+
+    def close(self):
+        """执行完所有排队的写操作后关闭写连接"""
+        if self._executor is None:
+            return
+        self._executor.submit(lambda: self._conn.close())
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        print("[DatabaseWriter] Writer closed")
+
+
+# 全局写入器实例
+db_writer = DatabaseWriter(db)
@@ -5,12 +5,18 @@
 import asyncio
 import argparse
 import sys
+import time
+
+# 启动计时起点（用于冷启动耗时报告）
+_STARTUP_BEGIN = time.perf_counter()
 
 from crawler.core import DouYinCrawler
-from database import db
+from database import db, db_writer
 from utils import logger
 import config
 
+_IMPORT_ELAPSED = time.perf_counter() - _STARTUP_BEGIN
+
 
 def parse_arguments():
     """解析命令行参数"""
@@ -29,6 +35,12 @@ def parse_arguments():
         help="搜索关键词，多个关键词用逗号分隔"
     )
     
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="从上次中断的断点继续爬取"
+    )
+    
     parser.add_argument(
         "--headless",
         action="store_true",
@@ -53,6 +65,9 @@ async def main():
     if args.headless:
         config.HEADLESS = True
     
+    if args.resume:
+        config.RESUME_CRAWL = True
+    
     # 打印配置信息
     logger.info("=" * 60)
     logger.info("抖音视频爬虫启动")
@@ -66,9 +81,11 @@ async def main():
     elif config.CRAWLER_TYPE == "creator":
         logger.info(f"指定创作者数量: {len(config.DY_CREATOR_ID_LIST)}")
     
+    logger.info(f"断点续爬: {config.RESUME_CRAWL}")
     logger.info(f"无头模式: {config.HEADLESS}")
     logger.info(f"下载媒体: {config.ENABLE_GET_MEDIA}")
     logger.info(f"数据库: {config.DATABASE_PATH}")
+    logger.info(f"启动耗时: 模块导入 {_IMPORT_ELAPSED * 1000:.0f} ms, 总计 {(time.perf_counter() - _STARTUP_BEGIN) * 1000:.0f} ms")
     logger.info("=" * 60)
     
     # 创建爬虫实例
@@ -86,6 +103,7 @@ async def main():
     finally:
         # 关闭浏览器和数据库
         await crawler.close()
+        db_writer.close()
         db.close()
         logger.info("程序结束")
 
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+创作者模式行为测试：详情失败时的增量位置、断点续爬、多创作者轮流翻页
+
+使用替换了网络请求的客户端，不需要浏览器和登录。用法（在 backend 目录执行）:
+    python -m unittest discover -s tests
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# 添加backend路径到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+
+# 数据库在导入 database 时按 DATABASE_PATH 初始化，必须先指向临时文件
+_TEMP_DIR = tempfile.mkdtemp()
+config.DATABASE_PATH = os.path.join(_TEMP_DIR, "test_creator_crawl.db")
+
+from crawler.client import DouYinClient
+from crawler.core import DouYinCrawler
+from crawler.exception import DataFetchError
+from crawler.rate_limiter import RateLimiter
+from database import db, db_writer, douyin_store
+
+PAGE_SIZE = 3
+
+
+class StubDouYinClient(DouYinClient):
+    """
+    替换网络请求的客户端，翻页和增量逻辑仍使用 DouYinClient 的实现
+
+    每个创作者有 pages[sec_user_id] 页作品，每页 PAGE_SIZE 个，发布时间从新到旧递减；
+    max_cursor 为页码。full_payload 为 True 时列表数据包含 CREATOR_DETAIL_REQUIRED_FIELDS
+    中的全部字段（incomplete 中的作品除外），否则只有 aweme_id 和 create_time。
+    """
+
+    def __init__(self, pages, fail_pages=(), fail_details=(), full_payload=False, incomplete=()):
+        super().__init__()
+        # 不限速，测试只关心请求顺序
+        self.rate_limiter = RateLimiter({})
+        self.pages = pages
+        self.fail_pages = set(fail_pages)
+        self.fail_details = set(fail_details)
+        self.full_payload = full_payload
+        self.incomplete = set(incomplete)
+        self.page_requests = []
+        self.detail_requests = []
+
+    @staticmethod
+    def aweme_id(sec_user_id, page, idx):
+        return f"{sec_user_id}{page * PAGE_SIZE + idx}"
+
+    @staticmethod
+    def create_time(page, idx):
+        return 10000 - page * PAGE_SIZE - idx
+
+    def post_item(self, sec_user_id, page, idx):
+        aweme_id = self.aweme_id(sec_user_id, page, idx)
+        item = {"aweme_id": aweme_id, "create_time": self.create_time(page, idx)}
+        if self.full_payload and aweme_id not in self.incomplete:
+            item.update({
+                "desc": f"列表描述 {aweme_id}",
+                "author": {"sec_uid": sec_user_id},
+                "statistics": {"digg_count": 1},
+                "video": {"play_addr": {"url_list": [f"https://example.com/{aweme_id}.mp4"]}},
+            })
+        return item
+
+    async def get_user_info(self, sec_user_id):
+        return {}
+
+    async def get_user_aweme_posts(self, sec_user_id, max_cursor=""):
+        page = int(max_cursor or 0)
+        self.page_requests.append((sec_user_id, page))
+        if (sec_user_id, page) in self.fail_pages:
+            raise DataFetchError("stub post_list failure")
+        return {
+            "has_more": 1 if page + 1 < self.pages[sec_user_id] else 0,
+            "max_cursor": str(page + 1),
+            "aweme_list": [self.post_item(sec_user_id, page, idx) for idx in range(PAGE_SIZE)],
+        }
+
+    async def get_video_by_id(self, aweme_id):
+        self.detail_requests.append(aweme_id)
+        # 让出事件循环，使详情处理与翻页交错
+        await asyncio.sleep(0)
+        if aweme_id in self.fail_details:
+            raise DataFetchError("stub detail failure")
+        return {"aweme_id": aweme_id, "desc": f"详情描述 {aweme_id}"}
+
+
+class CreatorCrawlTest(unittest.TestCase):
+
+    def setUp(self):
+        if db.db_path != config.DATABASE_PATH:
+            self.skipTest("database 模块已按其他 DATABASE_PATH 初始化")
+        for table in ("videos", "crawl_checkpoints", "creator_crawl_state"):
+            db.conn.execute(f"DELETE FROM {table}")
+        db.conn.commit()
+
+        patcher = mock.patch.multiple(
+            config,
+            ENABLE_GET_MEDIA=False,
+            ENABLE_INCREMENTAL_CREATOR=True,
+            ENABLE_CREATOR_LIST_PAYLOAD=False,
+            DEDUP_POLICY="none",
+            RESUME_CRAWL=False,
+            CREATOR_WORKER_NUM=1,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        # 写入线程的名额信号量绑定事件循环，每个测试结束后关闭，下次提交时重建
+        db_writer.close()
+
+    def crawl(self, creators, client):
+        """运行一次创作者模式，返回爬虫实例"""
+        crawler = DouYinCrawler()
+        crawler.dy_client = client
+
+        async def run():
+            await crawler.get_creators_and_videos()
+            await douyin_store.flush()
+
+        with mock.patch.object(config, "DY_CREATOR_ID_LIST", creators):
+            asyncio.run(run())
+        return crawler
+
+    @staticmethod
+    def watermark(sec_user_id):
+        row = db.fetchone(
+            "SELECT newest_create_time FROM creator_crawl_state WHERE sec_user_id = ?", (sec_user_id,)
+        )
+        return row[0] if row else None
+
+    @staticmethod
+    def saved_ids():
+        return {row[0] for row in db.fetchall("SELECT aweme_id FROM videos")}
+
+    def test_detail_failure_mid_page_keeps_watermark_before_failed_post(self):
+        failed_id = StubDouYinClient.aweme_id("A", 0, 1)
+        client = StubDouYinClient({"A": 2}, fail_details={failed_id})
+        crawler = self.crawl(["A"], client)
+
+        progress = crawler.creator_progress["A"]
+        self.assertEqual(progress["status"], "done")
+        self.assertEqual(progress["failed_videos"], 1)
+        self.assertNotIn(failed_id, self.saved_ids())
+        self.assertEqual(len(self.saved_ids()), 2 * PAGE_SIZE - 1)
+        # 增量位置停在失败作品之前，而不是本次翻到的最新作品
+        self.assertEqual(self.watermark("A"), StubDouYinClient.create_time(0, 1) - 1)
+
+        # 下一次增量爬取重新获取失败的作品，之后位置推进到最新作品
+        client = StubDouYinClient({"A": 2})
+        self.crawl(["A"], client)
+        self.assertIn(failed_id, client.detail_requests)
+        self.assertEqual(client.page_requests, [("A", 0)])
+        self.assertIn(failed_id, self.saved_ids())
+        self.assertEqual(self.watermark("A"), StubDouYinClient.create_time(0, 0))
+
+    def test_list_payload_detail_failure_is_not_saved_from_incomplete_entry(self):
+        failed_id = StubDouYinClient.aweme_id("A", 0, 1)
+        fetched_id = StubDouYinClient.aweme_id("A", 1, 0)
+        # 已有完整记录，不能被缺字段的列表数据覆盖
+        async def seed():
+            await douyin_store.save_video({"aweme_id": failed_id, "desc": "已保存的描述"})
+            await douyin_store.flush()
+        asyncio.run(seed())
+        db_writer.close()
+
+        client = StubDouYinClient(
+            {"A": 2}, fail_details={failed_id}, full_payload=True, incomplete={failed_id, fetched_id}
+        )
+        with mock.patch.object(config, "ENABLE_CREATOR_LIST_PAYLOAD", True):
+            crawler = self.crawl(["A"], client)
+
+        # 只有缺字段的作品请求详情
+        self.assertEqual(sorted(client.detail_requests), sorted([failed_id, fetched_id]))
+        self.assertEqual(crawler.creator_progress["A"]["failed_videos"], 1)
+        self.assertEqual(self.watermark("A"), StubDouYinClient.create_time(0, 1) - 1)
+        rows = {row[0]: row[1] for row in db.fetchall("SELECT aweme_id, desc FROM videos")}
+        self.assertEqual(rows[failed_id], "已保存的描述")
+        self.assertEqual(rows[fetched_id], f"详情描述 {fetched_id}")
+        self.assertEqual(rows[StubDouYinClient.aweme_id("A", 0, 0)], f"列表描述 {StubDouYinClient.aweme_id('A', 0, 0)}")
+
+    def test_resume_continues_from_max_cursor(self):
+        client = StubDouYinClient({"A": 4}, fail_pages={("A", 2)})
+        crawler = self.crawl(["A"], client)
+
+        self.assertEqual(crawler.creator_progress["A"]["status"], "failed")
+        checkpoint = douyin_store.get_checkpoint("creator", "A")
+        self.assertEqual(checkpoint["max_cursor"], "2")
+        self.assertFalse(checkpoint["done"])
+        # 翻页未完成时不记录增量位置
+        self.assertIsNone(self.watermark("A"))
+
+        with mock.patch.object(config, "RESUME_CRAWL", True):
+            client = StubDouYinClient({"A": 4})
+            crawler = self.crawl(["A"], client)
+
+        self.assertEqual(crawler.creator_progress["A"]["status"], "done")
+        self.assertEqual(client.page_requests, [("A", 2), ("A", 3)])
+        self.assertEqual(len(self.saved_ids()), 4 * PAGE_SIZE)
+        # 断点中保留了中断前已翻过页面的最新时间
+        self.assertEqual(self.watermark("A"), StubDouYinClient.create_time(0, 0))
+        self.assertIsNone(douyin_store.get_checkpoint("creator", "A"))
+
+    def test_creators_take_turns_one_page_at_a_time(self):
+        client = StubDouYinClient({"A": 4, "B": 1, "C": 3})
+        crawler = self.crawl(["A", "B", "C"], client)
+
+        self.assertEqual(
+            client.page_requests,
+            [("A", 0), ("B", 0), ("C", 0), ("A", 1), ("C", 1), ("A", 2), ("C", 2), ("A", 3)]
+        )
+        self.assertEqual({progress["status"] for progress in crawler.creator_progress.values()}, {"done"})
+        self.assertEqual(len(self.saved_ids()), 8 * PAGE_SIZE)
+
+
+if __name__ == "__main__":
+    unittest.main()
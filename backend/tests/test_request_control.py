@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+请求控制单元测试：令牌桶限速、AIMD 自适应并发、重试策略
+
+时间和等待使用假时钟，不依赖真实耗时。用法（在 backend 目录执行）:
+    python -m unittest discover -s tests
+"""
+import asyncio
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+# 添加backend路径到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+import config
+from crawler.concurrency import AdaptiveConcurrencyController
+from crawler.exception import DataFetchError
+from crawler.rate_limiter import RateLimiter
+from crawler.retry import Retrier
+
+
+class FakeClock:
+    """
+    假时钟：sleep 直接推进时间并记录等待时长
+
+    只替换被测模块中的 time / asyncio 引用，事件循环仍使用真实时钟
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+        self.time = SimpleNamespace(monotonic=self.monotonic)
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, delay):
+        self.sleeps.append(delay)
+        self.now += delay
+
+
+class RateLimiterTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        fake_asyncio = SimpleNamespace(sleep=self.clock.sleep, Lock=asyncio.Lock)
+        for target, fake in (("time", self.clock.time), ("asyncio", fake_asyncio)):
+            patcher = mock.patch(f"crawler.rate_limiter.{target}", fake)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def test_burst_then_paced_by_rate(self):
+        limiter = RateLimiter({"search": {"rate": 0.5, "burst": 2}})
+        for _ in range(4):
+            await limiter.acquire("search")
+        # 前 2 个使用突发令牌，之后每 2 秒 1 个
+        self.assertEqual(self.clock.sleeps, [2.0, 2.0])
+
+    async def test_unconfigured_endpoint_is_not_limited(self):
+        limiter = RateLimiter({"search": {"rate": 0.5, "burst": 1}})
+        for _ in range(5):
+            await limiter.acquire("detail")
+        self.assertEqual(self.clock.sleeps, [])
+
+    async def test_set_scale_skips_excluded_endpoints(self):
+        limiter = RateLimiter({"search": {"rate": 1, "burst": 1}, "media": {"rate": 5, "burst": 1}})
+        limiter.set_scale(0.5, exclude=("media",))
+        self.assertEqual(limiter.rates(), {"search": 0.5, "media": 5})
+
+
+class AdaptiveConcurrencyTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch("crawler.concurrency.time", self.clock.time)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.multiple(
+            config,
+            ENABLE_ADAPTIVE_CONCURRENCY=True,
+            MAX_CONCURRENCY_NUM=2,
+            ADAPTIVE_MIN_CONCURRENCY=1,
+            ADAPTIVE_MAX_CONCURRENCY=2,
+            ADAPTIVE_MIN_RATE_SCALE=0.1,
+            ADAPTIVE_MAX_RATE_SCALE=1.0,
+            ADAPTIVE_RATE_STEP=0.1,
+            ADAPTIVE_DECREASE_FACTOR=0.5,
+            ADAPTIVE_ERROR_BURST=3,
+            ADAPTIVE_ERROR_WINDOW_SEC=30,
+            ADAPTIVE_COOLDOWN_SEC=10,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.limiter = RateLimiter({"detail": {"rate": 0.5, "burst": 1}, "media": {"rate": 5, "burst": 1}})
+        self.controller = AdaptiveConcurrencyController(self.limiter)
+
+    async def test_successes_do_not_exceed_configured_limits(self):
+        for _ in range(100):
+            self.controller.record_success()
+        self.assertEqual(self.controller.current_limit, 2)
+        self.assertEqual(self.controller.rate_scale, 1.0)
+        self.assertEqual(self.limiter.rates()["detail"], 0.5)
+        self.assertEqual(self.controller.increases, 0)
+
+    async def test_recovers_to_configured_limits_after_backoff(self):
+        self.controller.record_failure("blocked")
+        self.assertEqual(self.controller.current_limit, 1)
+        self.assertEqual(self.limiter.rates(), {"detail": 0.25, "media": 5})
+
+        # 每连续成功一个并发窗口加一次，直到回到配置值
+        self.controller.record_success()
+        self.assertEqual(self.controller.current_limit, 2)
+        self.assertAlmostEqual(self.controller.rate_scale, 0.6)
+        for _ in range(20):
+            self.controller.record_success()
+        self.assertEqual(self.controller.current_limit, 2)
+        self.assertEqual(self.controller.rate_scale, 1.0)
+        self.assertEqual(self.limiter.rates()["detail"], 0.5)
+
+    async def test_ramp_up_beyond_config_only_when_ceiling_raised(self):
+        with mock.patch.multiple(config, ADAPTIVE_MAX_CONCURRENCY=4, ADAPTIVE_MAX_RATE_SCALE=1.2):
+            controller = AdaptiveConcurrencyController(self.limiter)
+        with mock.patch.object(config, "ADAPTIVE_MAX_RATE_SCALE", 1.2):
+            for _ in range(100):
+                controller.record_success()
+        self.assertEqual(controller.current_limit, 4)
+        self.assertAlmostEqual(controller.rate_scale, 1.2)
+
+    async def test_cooldown_allows_one_decrease_per_window(self):
+        self.controller.record_failure("http_429")
+        self.controller.record_failure("blocked")
+        self.assertEqual(self.controller.decreases, 1)
+        self.assertEqual(self.controller.rate_scale, 0.5)
+
+        self.clock.now += config.ADAPTIVE_COOLDOWN_SEC
+        self.controller.record_failure("blocked")
+        self.assertEqual(self.controller.decreases, 2)
+        self.assertEqual(self.controller.rate_scale, 0.25)
+
+    async def test_error_burst_window(self):
+        # 窗口内未达到突发数量不降速
+        self.controller.record_failure("fetch_error")
+        self.controller.record_failure("http_5xx")
+        self.assertEqual(self.controller.decreases, 0)
+
+        # 最早的错误滑出窗口后重新计数
+        self.clock.now += config.ADAPTIVE_ERROR_WINDOW_SEC + 1
+        self.controller.record_failure("fetch_error")
+        self.controller.record_failure("fetch_error")
+        self.assertEqual(self.controller.decreases, 0)
+
+        self.controller.record_failure("fetch_error")
+        self.assertEqual(self.controller.decreases, 1)
+        self.assertEqual(self.controller.failures["fetch_error"], 4)
+
+    async def test_disabled_controller_only_counts(self):
+        with mock.patch.object(config, "ENABLE_ADAPTIVE_CONCURRENCY", False):
+            controller = AdaptiveConcurrencyController(self.limiter)
+        controller.record_failure("blocked")
+        controller.record_success()
+        self.assertEqual((controller.decreases, controller.successes), (0, 1))
+        self.assertEqual(self.limiter.rates()["detail"], 0.5)
+
+
+class RetrierTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch("crawler.retry.asyncio", SimpleNamespace(sleep=self.clock.sleep))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.retrier = Retrier(
+            {"default": {"max_attempts": 3, "backoff_base": 1, "backoff_max": 4, "retry_statuses": [503]}},
+            budget=10
+        )
+
+    @staticmethod
+    def failing(errors, result="ok"):
+        """依次抛出 errors 中的异常，之后返回 result"""
+        errors = list(errors)
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            if errors:
+                raise errors.pop(0)
+            return result
+        return fn, calls
+
+    async def test_retries_retryable_errors_with_backoff(self):
+        fn, calls = self.failing([DataFetchError("x", status_code=503), httpx.TimeoutException("t")])
+        self.assertEqual(await self.retrier.call("detail", fn), "ok")
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(self.retrier.retries["detail"], 2)
+        # 全抖动：第 n 次失败后等待 0 ~ min(max, base * 2^(n-1))
+        self.assertLessEqual(self.clock.sleeps[0], 1)
+        self.assertLessEqual(self.clock.sleeps[1], 2)
+
+    async def test_non_retryable_error_raises_immediately(self):
+        fn, calls = self.failing([DataFetchError("blocked", status_code=403)])
+        with self.assertRaises(DataFetchError):
+            await self.retrier.call("detail", fn)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.clock.sleeps, [])
+
+    async def test_gives_up_after_max_attempts(self):
+        fn, calls = self.failing([DataFetchError("x", status_code=503)] * 5)
+        with self.assertRaises(DataFetchError):
+            await self.retrier.call("detail", fn)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(self.retrier.give_ups["detail"], 1)
+
+    async def test_budget_is_shared_across_calls(self):
+        retrier = Retrier({"default": {"max_attempts": 5, "retry_statuses": [503]}}, budget=2)
+        fn, calls = self.failing([DataFetchError("x", status_code=503)] * 5)
+        with self.assertRaises(DataFetchError):
+            await retrier.call("search", fn)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(retrier.budget_remaining, 0)
+
+        # 预算耗尽后不再重试
+        fn, calls = self.failing([DataFetchError("x", status_code=503)])
+        with self.assertRaises(DataFetchError):
+            await retrier.call("detail", fn)
+        self.assertEqual(len(calls), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
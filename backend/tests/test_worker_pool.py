@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+有界队列协程池测试（详情协程池和媒体下载器共用）
+
+用法（在 backend 目录执行）:
+    python -m unittest discover -s tests
+"""
+import asyncio
+import os
+import sys
+import unittest
+
+# 添加backend路径到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawler.detail_pool import DetailWorkerPool
+from crawler.downloader import MediaDownloader
+from crawler.worker_pool import WorkerPool
+
+
+class WorkerPoolTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_close_drains_queue_and_counts_failures(self):
+        handled = []
+
+        async def handler(item):
+            await asyncio.sleep(0)
+            if item % 5 == 0:
+                raise ValueError("boom")
+            handled.append(item)
+
+        pool = WorkerPool(handler, worker_num=3, queue_size=2)
+        for item in range(1, 21):
+            await pool.submit(item)
+        await pool.close()
+
+        self.assertEqual(sorted(handled), [item for item in range(1, 21) if item % 5])
+        self.assertEqual((pool.processed, pool.failed), (16, 4))
+        self.assertEqual(pool._workers, [])
+
+    async def test_submit_waits_when_queue_is_full(self):
+        release = asyncio.Event()
+
+        async def handler(item):
+            await release.wait()
+
+        pool = WorkerPool(handler, worker_num=1, queue_size=1)
+        await pool.submit(1)
+        await asyncio.sleep(0)  # 协程取走第 1 个任务
+        await pool.submit(2)
+        blocked = asyncio.create_task(pool.submit(3))
+        await asyncio.sleep(0)
+        self.assertFalse(blocked.done())
+
+        release.set()
+        await blocked
+        await pool.close()
+        self.assertEqual(pool.processed, 3)
+
+    async def test_subclasses_share_the_pool(self):
+        items = []
+
+        async def handler(item):
+            items.append(item)
+
+        detail_pool = DetailWorkerPool(handler, worker_num=2, queue_size=1)
+        downloader = MediaDownloader(handler, worker_num=2, queue_size=1)
+        await detail_pool.submit("1")
+        await downloader.submit({"aweme_id": "2"})
+        await detail_pool.close()
+        await downloader.close()
+        self.assertEqual(items, ["1", {"aweme_id": "2"}])
+        self.assertEqual(downloader.describe({"aweme_id": "2"}), "2")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,9 +3,11 @@
 工具模块入口
 """
 from .logger import logger, Logger
+from .signer import DouyinSigner
 from .helpers import (
     get_web_id,
     get_a_bogus,
+    douyin_signer,
     parse_video_info_from_url,
     parse_creator_info_from_url,
     convert_cookies,
@@ -14,7 +16,7 @@ from .helpers import (
 
 __all__ = [
     'logger', 'Logger',
-    'get_web_id', 'get_a_bogus',
+    'get_web_id', 'get_a_bogus', 'douyin_signer', 'DouyinSigner',
     'parse_video_info_from_url', 'parse_creator_info_from_url',
     'convert_cookies', 'extract_url_params_to_dict'
 ]
@@ -2,20 +2,17 @@
 """
 工具辅助函数
 """
-import os
 import random
 import re
 import urllib.parse
 from typing import Dict
-import execjs
 from playwright.async_api import Page
 from crawler.field import VideoUrlInfo, CreatorUrlInfo
+from .signer import DouyinSigner
 
 
-# 加载 douyin.js - 使用绝对路径
-_current_dir = os.path.dirname(os.path.abspath(__file__))
-_douyin_js_path = os.path.join(os.path.dirname(_current_dir), 'libs', 'douyin.js')
-douyin_sign_obj = execjs.compile(open(_douyin_js_path, encoding='utf-8-sig').read())
+# 全局签名服务（douyin.js 上下文池，首次签名或预热时编译）
+douyin_signer = DouyinSigner()
 
 
 def get_web_id():
@@ -53,7 +50,7 @@ async def get_a_bogus(url: str, params: str, post_data: dict, user_agent: str, p
     Returns:
         str: a_bogus值
     """
-    return get_a_bogus_from_js(url, params, user_agent)
+    return await douyin_signer.sign(url, params, user_agent)
 
 
 def get_a_bogus_from_js(url: str, params: str, user_agent: str):
@@ -68,10 +65,7 @@ def get_a_bogus_from_js(url: str, params: str, user_agent: str):
     Returns:
         str: a_bogus值
     """
-    sign_js_name = "sign_datail"
-    if "/reply" in url:
-        sign_js_name = "sign_reply"
-    return douyin_sign_obj.call(sign_js_name, params, user_agent)
+    return douyin_signer.sign_sync(url, params, user_agent)
 
 
 def parse_video_info_from_url(url: str) -> VideoUrlInfo:
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+a_bogus 签名服务
+"""
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import execjs
+
+import config
+from .logger import logger
+
+
+# douyin.js 路径 - 使用绝对路径
+_current_dir = os.path.dirname(os.path.abspath(__file__))
+DOUYIN_JS_PATH = os.path.join(os.path.dirname(_current_dir), 'libs', 'douyin.js')
+
+
+class DouyinSigner:
+    """签名服务：N 个预编译的 douyin.js 上下文在工作线程中执行，不阻塞事件循环"""
+
+    def __init__(self, js_path: str = DOUYIN_JS_PATH, worker_num: int = None, queue_size: int = None):
+        self.js_path = js_path
+        self.worker_num = worker_num or config.SIGN_WORKER_NUM
+        self.queue_size = queue_size or config.SIGN_QUEUE_SIZE
+
+        # JS 上下文在首次使用时才编译，导入模块不再承担编译开销
+        self._js_source: str = None
+        self._contexts: queue.Queue = queue.Queue()
+        self._created = 0
+        self._compile_lock = threading.Lock()
+
+        self._executor = ThreadPoolExecutor(max_workers=self.worker_num, thread_name_prefix="douyin-signer")
+        # 正在执行 + 排队等待的签名任务总数上限
+        self._slots = asyncio.Semaphore(self.worker_num + self.queue_size)
+
+    def _compile_context(self):
+        """编译一个新的 douyin.js 上下文"""
+        if self._js_source is None:
+            self._js_source = open(self.js_path, encoding='utf-8-sig').read()
+        return execjs.compile(self._js_source)
+
+    def _acquire_context(self):
+        """借用一个 JS 上下文，池未满时按需编译"""
+        try:
+            return self._contexts.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._compile_lock:
+            if self._created < self.worker_num:
+                self._created += 1
+                try:
+                    return self._compile_context()
+                except Exception:
+                    self._created -= 1
+                    raise
+        return self._contexts.get()
+
+    def warm_up_sync(self):
+        """预编译所有 JS 上下文"""
+        start = time.perf_counter()
+        with self._compile_lock:
+            while self._created < self.worker_num:
+                self._contexts.put(self._compile_context())
+                self._created += 1
+        logger.info(f"[DouyinSigner] douyin.js 预编译完成，耗时 {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    async def warm_up(self):
+        """在工作线程中预编译，供启动阶段作为后台任务调用"""
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._executor, self.warm_up_sync)
+        except Exception as e:
+            logger.warning(f"[DouyinSigner] douyin.js 预编译失败，将在首次签名时重试: {e}")
+
+    def sign_sync(self, uri: str, query: str, user_agent: str) -> str:
+        """同步签名，从池中借用一个 JS 上下文"""
+        sign_js_name = "sign_datail"
+        if "/reply" in uri:
+            sign_js_name = "sign_reply"
+
+        ctx = self._acquire_context()
+        try:
+            return ctx.call(sign_js_name, query, user_agent)
+        finally:
+            self._contexts.put(ctx)
+
+    async def sign(self, uri: str, query: str, user_agent: str) -> str:
+        """异步签名，在工作线程中执行；队列已满时等待"""
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self.sign_sync, uri, query, user_agent)
+
+    def close(self):
+        """关闭工作线程"""
+        self._executor.shutdown(wait=False)